@@ -7,13 +7,64 @@ A simple web-based chat interface for interacting with the trained compliance mo
 import os
 import json
 import logging
+import queue
+import threading
+import time
+from contextlib import nullcontext
 from datetime import datetime
-from flask import Flask, render_template, request, jsonify, session
+from functools import lru_cache
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeoutError
+from flask import Flask, Response, render_template, request, jsonify, session
+
+# Pin BLAS/OpenMP threads before torch loads so concurrent requests don't oversubscribe cores
+TORCH_NUM_THREADS = int(os.environ.get('TORCH_NUM_THREADS', '4'))
+os.environ.setdefault('OMP_NUM_THREADS', str(TORCH_NUM_THREADS))
+os.environ.setdefault('MKL_NUM_THREADS', str(TORCH_NUM_THREADS))
+
 import torch
-from transformers import T5ForConditionalGeneration, T5Tokenizer
-import pandas as pd
+from transformers import T5ForConditionalGeneration, T5TokenizerFast
+from transformers.modeling_outputs import BaseModelOutput
 import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import intel_extension_for_pytorch as ipex
+    HAS_IPEX = True
+except ImportError:
+    HAS_IPEX = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import hyperscan
+    HAS_HYPERSCAN = True
+except ImportError:
+    HAS_HYPERSCAN = False
+
+try:
+    import redis
+    from flask_session import Session
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+
+torch.set_num_threads(TORCH_NUM_THREADS)
+torch.set_num_interop_threads(1)
+
+def cpu_supports_bf16():
+    """Check whether oneDNN has native BF16 kernels on this CPU (AVX-512-BF16/AMX)"""
+    if os.environ.get('USE_BF16', '1') == '0':
+        return False
+    try:
+        return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except Exception:
+        return False
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -26,6 +77,125 @@ app.secret_key = 'your-secret-key-change-in-production'
 ORCHESTRATOR_URL = "http://localhost:5003"
 SAILPOINT_URL = "http://localhost:5002"
 
+# Redis-backed sessions and chat history
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+CHAT_HISTORY_LIMIT = 50
+SAILPOINT_STATUS_TTL = 5  # seconds
+
+# Audit history is a capped Redis list shared by every gunicorn worker, or per-process without Redis
+AUDIT_HISTORY_KEY = 'chat:audit_history'
+AUDIT_HISTORY_LIMIT = 20
+
+def init_redis():
+    """Connect to Redis and move session storage there, or fall back to cookie sessions"""
+    if not HAS_REDIS:
+        logger.warning("redis/Flask-Session not installed, using cookie sessions")
+        return None
+    try:
+        client = redis.Redis.from_url(REDIS_URL)
+        client.ping()
+    except Exception as e:
+        logger.warning(f"Redis not available, using cookie sessions: {str(e)}")
+        return None
+    app.config['SESSION_TYPE'] = 'redis'
+    app.config['SESSION_REDIS'] = client
+    Session(app)
+    logger.info("Using Redis-backed sessions")
+    return client
+
+redis_client = init_redis()
+
+# Shared HTTP session so chat turns reuse pooled keep-alive connections
+HTTP = requests.Session()
+HTTP.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=32))
+HTTP.headers.update({'Connection': 'keep-alive'})
+
+# Dynamic batching for the background inference worker
+INFERENCE_BATCH_SIZE = 16
+INFERENCE_MAX_WAIT = 0.01  # seconds to wait for more events before running a batch
+INFERENCE_TIMEOUT = 30  # seconds a chat request waits for its analysis
+
+# Prompts are truncated at the model's usual 512-token limit and padded up to a multiple of
+# PROMPT_PAD_MULTIPLE; the analysis prompt is about 60-90 tokens, so nearly every batch lands in
+# the 128 bucket instead of paying for 512 encoder and cross-attention positions
+PROMPT_MAX_LENGTH = 512
+PROMPT_PAD_MULTIPLE = 128
+
+# Prompt template for compliance analysis; missing fields render as 'unknown'
+ANALYSIS_PROMPT_TEMPLATE = (
+    "Analyze this access event for SOX and IAM compliance:\n"
+    "\n"
+    "User ID: {user_id}\n"
+    "Action: {action}\n"
+    "Resource: {resource}\n"
+    "Access Level: {access_level}\n"
+    "Authentication: {auth_method}\n"
+    "Time: {timestamp}\n"
+    "Risk Score: {risk_score}\n"
+    "\n"
+    "Evaluate compliance status and provide reasoning:"
+)
+
+# Keywords that mark a violation when the model response also reports one
+VIOLATION_KEYWORDS = (
+    ("SOX", "SOX compliance violation"),
+    ("IAM", "IAM policy violation"),
+)
+
+# Every keyword parse_model_response looks for, scanned in a single pass
+RESPONSE_KEYWORDS = ("COMPLIANT", "NON-COMPLIANT", "VIOLATION", "SOX", "IAM", "PRIVILEGE", "ESCALATION")
+
+def build_keyword_database():
+    """Compile RESPONSE_KEYWORDS into a Hyperscan database, or None if unavailable"""
+    if not HAS_HYPERSCAN:
+        return None
+    try:
+        database = hyperscan.Database()
+        database.compile(
+            expressions=[keyword.encode('utf-8') for keyword in RESPONSE_KEYWORDS],
+            ids=list(range(len(RESPONSE_KEYWORDS))),
+            elements=len(RESPONSE_KEYWORDS),
+            flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(RESPONSE_KEYWORDS)
+        )
+        return database
+    except Exception as e:
+        logger.warning(f"Could not compile Hyperscan keyword database: {str(e)}")
+        return None
+
+KEYWORD_DATABASE = build_keyword_database()
+
+def find_keywords(text):
+    """Return the RESPONSE_KEYWORDS that occur in text, ignoring case"""
+    if KEYWORD_DATABASE is None:
+        upper_text = text.upper()
+        return {keyword for keyword in RESPONSE_KEYWORDS if keyword in upper_text}
+    
+    found = set()
+    def on_match(pattern_id, start, end, flags, context):
+        found.add(RESPONSE_KEYWORDS[pattern_id])
+    KEYWORD_DATABASE.scan(text.encode('utf-8'), match_event_handler=on_match)
+    return found
+
+# Worker pool for issuing independent API calls concurrently
+HTTP_EXECUTOR = ThreadPoolExecutor(max_workers=8)
+
+def fetch_concurrently(*urls, timeout=10):
+    """GET several URLs in parallel; each result is a response or the raised exception"""
+    futures = [HTTP_EXECUTOR.submit(HTTP.get, url, timeout=timeout) for url in urls]
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception as e:
+            results.append(e)
+    return results
+
+def unwrap_response(result):
+    """Return a response from fetch_concurrently, re-raising a failed request"""
+    if isinstance(result, Exception):
+        raise result
+    return result
+
 class ComplianceOrchestrator:
     """
     Orchestrator for compliance analysis and data management
@@ -36,8 +206,62 @@ class ComplianceOrchestrator:
         self.model_path = model_path
         self.model = None
         self.tokenizer = None
+        self.encoder = None
+        self.use_bf16 = False
+        # Templated events often repeat, so memoize tokenization per prompt string
+        self.tokenize_prompt = lru_cache(maxsize=4096)(self._tokenize_prompt)
         self.load_model()
         self.audit_history = []
+        self.start_inference_worker()
+        
+    def start_inference_worker(self):
+        """Start the background thread that owns the model and batches queued events"""
+        self.inference_queue = queue.Queue()
+        worker = threading.Thread(target=self._inference_worker, daemon=True)
+        worker.start()
+    
+    def submit_event(self, event_data):
+        """Queue an event for analysis and return a Future for its result"""
+        future = Future()
+        self.inference_queue.put((event_data, future))
+        return future
+    
+    def _inference_worker(self):
+        """Collect queued events into batches and analyze them together"""
+        while True:
+            batch = [self.inference_queue.get()]
+            deadline = time.monotonic() + INFERENCE_MAX_WAIT
+            while len(batch) < INFERENCE_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.inference_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            # A failed batch fails only its own futures; the worker keeps serving later events
+            try:
+                analyses = self.analyze_batch([event for event, _ in batch])
+                if len(analyses) != len(batch):
+                    raise RuntimeError(f"Expected {len(batch)} analyses, got {len(analyses)}")
+                for (_, future), analysis in zip(batch, analyses):
+                    future.set_result(analysis)
+            except Exception as e:
+                logger.error(f"Inference batch failed: {str(e)}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+    
+    def wait_for_analysis(self, future, event_data):
+        """Wait for a queued analysis, falling back to rule-based analysis on timeout or failure"""
+        try:
+            return future.result(timeout=INFERENCE_TIMEOUT)
+        except FutureTimeoutError:
+            logger.warning("Model analysis timed out, using rule-based analysis")
+        except Exception as e:
+            logger.error(f"Model analysis failed, using rule-based analysis: {str(e)}")
+        return self.fallback_analysis(event_data)
         
     def load_model(self):
         """Load the trained compliance model"""
@@ -45,22 +269,54 @@ class ComplianceOrchestrator:
             logger.info(f"Loading model from {self.model_path}")
             # Always use the pre-trained model - no fallback to base model
             if os.path.exists(self.model_path):
-                self.tokenizer = T5Tokenizer.from_pretrained(self.model_path)
+                self.tokenizer = T5TokenizerFast.from_pretrained(self.model_path)
                 self.model = T5ForConditionalGeneration.from_pretrained(self.model_path)
                 self.model.eval()
+                self.use_bf16 = cpu_supports_bf16()
+                if self.use_bf16:
+                    # BF16 weights on CPUs with native BF16 matmuls; autocast keeps norms/softmax in FP32
+                    self.model = self.model.to(torch.bfloat16)
+                    if HAS_IPEX:
+                        self.model = ipex.optimize(self.model, dtype=torch.bfloat16)
+                    logger.info("Using BF16 inference")
+                else:
+                    # Int8 dynamic quantization of the Linear layers; must happen before scripting
+                    self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+                # Keep a handle on the encoder so it runs once per input, not per beam step
+                self.encoder = self.compile_encoder(self.model.get_encoder())
                 logger.info("Model loaded successfully")
             else:
                 raise FileNotFoundError(f"Trained model not found at {self.model_path}")
         except Exception as e:
             logger.error(f"Error loading model: {str(e)}")
             raise e
+
+    def compile_encoder(self, encoder):
+        """Compile the encoder for inference, falling back to TorchScript and then eager mode"""
+        if hasattr(torch, 'compile'):
+            try:
+                # The batcher sends 1 to INFERENCE_BATCH_SIZE prompts, so shapes are compiled as dynamic
+                # rather than recompiling per batch size; 'reduce-overhead' is CUDA graphs only, so not used on CPU
+                compiled = torch.compile(encoder, dynamic=True)
+                logger.info("Encoder compiled with torch.compile")
+                return compiled
+            except Exception as e:
+                logger.warning(f"torch.compile failed, trying TorchScript: {str(e)}")
+        try:
+            scripted = torch.jit.script(encoder)
+            scripted = torch.jit.optimize_for_inference(scripted)
+            logger.info("Encoder compiled with TorchScript")
+            return scripted
+        except Exception as e:
+            logger.warning(f"TorchScript compilation failed, using eager encoder: {str(e)}")
+            return encoder
                 
     def load_audit_data(self):
         """Load audit data from SailPoint API (no training data)"""
         # Only use real SailPoint data - do not load training files
         try:
             # Try to get data from SailPoint API
-            response = requests.get(f"{SAILPOINT_URL}/api/v1/access-records", timeout=10)
+            response = HTTP.get(f"{SAILPOINT_URL}/api/v1/access-records", timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 access_records = data.get('data', {}).get('items', [])
@@ -80,21 +336,10 @@ class ComplianceOrchestrator:
             input_text = self.create_analysis_prompt(event_data)
             
             # Tokenize input
-            inputs = self.tokenizer(input_text, return_tensors="pt", max_length=512, truncation=True)
-            
-            # Generate response
-            with torch.no_grad():
-                outputs = self.model.generate(
-                    inputs['input_ids'],
-                    max_length=256,
-                    num_beams=4,
-                    temperature=0.7,
-                    do_sample=False,
-                    early_stopping=True
-                )
+            inputs = self.tokenize_prompt(input_text)
             
-            # Decode response
-            response = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
+            # Generate and decode response
+            response = self.generate_responses(inputs)[0]
             
             # Parse response into structured analysis
             analysis = self.parse_model_response(response, event_data)
@@ -106,38 +351,85 @@ class ComplianceOrchestrator:
             # Fallback analysis
             return self.fallback_analysis(event_data)
     
+    def _tokenize_prompt(self, prompt):
+        """Tokenize a single prompt for the model"""
+        return self.tokenizer(prompt, return_tensors="pt", padding=True, pad_to_multiple_of=PROMPT_PAD_MULTIPLE, max_length=PROMPT_MAX_LENGTH, truncation=True)
+    
+    def analyze_batch(self, events):
+        """Analyze several compliance events with one tokenizer and generate call"""
+        if not events:
+            return []
+        try:
+            prompts = [self.create_analysis_prompt(e) for e in events]
+            if len(prompts) == 1:
+                inputs = self.tokenize_prompt(prompts[0])
+            else:
+                inputs = self.tokenizer(prompts, return_tensors="pt", padding=True, pad_to_multiple_of=PROMPT_PAD_MULTIPLE, max_length=PROMPT_MAX_LENGTH, truncation=True)
+            responses = self.generate_responses(inputs)
+            return [self.parse_model_response(r, e) for r, e in zip(responses, events)]
+        except Exception as e:
+            logger.error(f"Error analyzing compliance batch: {str(e)}")
+            return [self.fallback_analysis(event) for event in events]
+    
+    def generate_responses(self, inputs):
+        """Run the model on tokenized inputs and return the decoded responses"""
+        # Run the encoder once and hand its outputs to the decoder
+        precision = torch.autocast(device_type='cpu', dtype=torch.bfloat16) if self.use_bf16 else nullcontext()
+        with torch.no_grad(), precision:
+            try:
+                encoder_outputs = self.encoder(
+                    input_ids=inputs['input_ids'],
+                    attention_mask=inputs['attention_mask'],
+                    return_dict=True
+                )
+            except Exception as e:
+                # Compiled graphs can fail on first use; drop back to the eager encoder
+                logger.warning(f"Compiled encoder failed, using eager encoder: {str(e)}")
+                self.encoder = self.model.get_encoder()
+                encoder_outputs = self.encoder(
+                    input_ids=inputs['input_ids'],
+                    attention_mask=inputs['attention_mask'],
+                    return_dict=True
+                )
+            if not isinstance(encoder_outputs, BaseModelOutput):
+                # Scripted encoders return plain dicts/tuples
+                encoder_outputs = BaseModelOutput(last_hidden_state=encoder_outputs[0] if isinstance(encoder_outputs, tuple) else encoder_outputs['last_hidden_state'])
+            outputs = self.model.generate(
+                encoder_outputs=encoder_outputs,
+                attention_mask=inputs['attention_mask'],
+                max_new_tokens=64,
+                num_beams=1,  # Greedy is enough for the keyword checks in parse_model_response
+                do_sample=False
+            )
+        
+        return self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+    
     def create_analysis_prompt(self, event_data):
         """Create a structured prompt for compliance analysis"""
-        prompt = f"""
-        Analyze this access event for SOX and IAM compliance:
-        
-        User ID: {event_data.get('user_id', 'unknown')}
-        Action: {event_data.get('action', 'unknown')}
-        Resource: {event_data.get('resource', 'unknown')}
-        Access Level: {event_data.get('access_level', 'unknown')}
-        Authentication: {event_data.get('auth_method', 'unknown')}
-        Time: {event_data.get('timestamp', datetime.now().isoformat())}
-        Risk Score: {event_data.get('risk_score', 0.5)}
-        
-        Evaluate compliance status and provide reasoning:
-        """
-        return prompt.strip()
+        # A missing timestamp renders as 'unknown' rather than now(), so identical events share a prompt
+        fields = defaultdict(lambda: 'unknown', event_data)
+        if 'risk_score' not in fields:
+            fields['risk_score'] = 0.5
+        return ANALYSIS_PROMPT_TEMPLATE.format_map(fields)
     
     def parse_model_response(self, response, event_data):
         """Parse model response into structured analysis"""
         # Simple parsing logic - can be enhanced based on model output format
-        is_compliant = "COMPLIANT" in response.upper() and "NON-COMPLIANT" not in response.upper()
+        # Find every keyword in one scan and reuse the result for each check
+        keywords = find_keywords(response)
+        non_compliant = "NON-COMPLIANT" in keywords
+        is_compliant = "COMPLIANT" in keywords and not non_compliant
         
         risk_score = event_data.get('risk_score', 0.5)
         if not is_compliant:
             risk_score = max(risk_score, 0.7)
         
-        violations = []
-        if "SOX" in response.upper() and ("VIOLATION" in response.upper() or "NON-COMPLIANT" in response.upper()):
-            violations.append("SOX compliance violation")
-        if "IAM" in response.upper() and ("VIOLATION" in response.upper() or "NON-COMPLIANT" in response.upper()):
-            violations.append("IAM policy violation")
-        if "PRIVILEGE" in response.upper() and "ESCALATION" in response.upper():
+        flags_violation = non_compliant or "VIOLATION" in keywords
+        violations = [
+            label for keyword, label in VIOLATION_KEYWORDS
+            if flags_violation and keyword in keywords
+        ]
+        if "PRIVILEGE" in keywords and "ESCALATION" in keywords:
             violations.append("Privilege escalation detected")
         
         return {
@@ -195,30 +487,27 @@ class ComplianceOrchestrator:
         
         # Analyze each record
         results = []
-        compliant_count = 0
-        total_risk_score = 0
         
-        for i, record in enumerate(audit_data[:10]):  # Limit to 10 for demo
-            try:
-                analysis = self.analyze_compliance_event(record)
-                results.append({
-                    'record_id': i + 1,
-                    'user_id': record.get('user_id', f'user_{i+1}'),
-                    'action': record.get('action', 'unknown'),
-                    'analysis': analysis
-                })
-                
-                if analysis['is_compliant']:
-                    compliant_count += 1
-                total_risk_score += analysis['risk_score']
-                
-            except Exception as e:
-                logger.error(f"Error analyzing record {i}: {str(e)}")
+        records = audit_data[:10]  # Limit to 10 for demo
+        futures = [self.submit_event(record) for record in records]
+        analyses = [self.wait_for_analysis(future, record) for future, record in zip(futures, records)]
+        
+        for i, (record, analysis) in enumerate(zip(records, analyses)):
+            results.append({
+                'record_id': i + 1,
+                'user_id': record.get('user_id', f'user_{i+1}'),
+                'action': record.get('action', 'unknown'),
+                'analysis': analysis
+            })
         
-        # Generate summary
+        # Generate summary with vectorized reductions over the analyses
         total_records = len(results)
+        risk_scores = np.fromiter((a['risk_score'] for a in analyses), dtype=np.float64, count=total_records)
+        compliant = np.fromiter((a['is_compliant'] for a in analyses), dtype=bool, count=total_records)
+        compliant_count = int(np.count_nonzero(compliant))
+        high_risk_events = int(np.count_nonzero(risk_scores > 0.7))
         compliance_rate = (compliant_count / total_records * 100) if total_records > 0 else 0
-        avg_risk_score = total_risk_score / total_records if total_records > 0 else 0
+        avg_risk_score = float(risk_scores.mean()) if total_records > 0 else 0
         
         audit_result = {
             'status': 'completed',
@@ -229,18 +518,41 @@ class ComplianceOrchestrator:
                 'non_compliant_records': total_records - compliant_count,
                 'compliance_rate': f"{compliance_rate:.1f}%",
                 'average_risk_score': f"{avg_risk_score:.3f}",
-                'high_risk_events': len([r for r in results if r['analysis']['risk_score'] > 0.7])
+                'high_risk_events': high_risk_events
             },
             'detailed_results': results[:5],  # Show first 5 for demo
             'total_analyzed': len(audit_data)
         }
         
         # Store in audit history
-        self.audit_history.append(audit_result)
+        self.record_audit(audit_result)
         
         logger.info(f"Audit completed: {compliance_rate:.1f}% compliance rate")
         return audit_result
 
+    def record_audit(self, audit_result):
+        """Add an audit to the history, in Redis when available so every worker sees it"""
+        self.audit_history.append(audit_result)
+        del self.audit_history[:-AUDIT_HISTORY_LIMIT]
+        if redis_client is None:
+            return
+        try:
+            pipe = redis_client.pipeline()
+            pipe.rpush(AUDIT_HISTORY_KEY, json.dumps(audit_result, default=str))
+            pipe.ltrim(AUDIT_HISTORY_KEY, -AUDIT_HISTORY_LIMIT, -1)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Could not store audit history in Redis: {str(e)}")
+    
+    def recent_audits(self, count):
+        """The most recent audits, oldest first, from Redis when available"""
+        if redis_client is not None:
+            try:
+                return [json.loads(audit) for audit in redis_client.lrange(AUDIT_HISTORY_KEY, -count, -1)]
+            except Exception as e:
+                logger.warning(f"Redis audit history unavailable, using this worker's: {str(e)}")
+        return self.audit_history[-count:]
+
 # Initialize the orchestrator with better error handling
 try:
     orchestrator = ComplianceOrchestrator('./trained_compliance_model')
@@ -249,6 +561,66 @@ except Exception as e:
     print(f"Warning: Could not initialize orchestrator: {str(e)}")
     orchestrator = None
 
+# Under `gunicorn --preload` the model is loaded once here and shared copy-on-write with every
+# forked worker, but threads do not survive fork, so each worker starts its own inference thread
+if orchestrator is not None and hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=orchestrator.start_inference_worker)
+
+def ojsonify(obj):
+    """Serialize obj to a JSON response with orjson, falling back to Flask's jsonify"""
+    if HAS_ORJSON:
+        return Response(orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY), mimetype='application/json')
+    return jsonify(obj)
+
+# Static chat responses, built once at import
+HELP_TEXT = """
+**IAM SOX Compliance Assistant**
+
+**Available Commands:**
+• `run audit` - Execute full compliance audit (SailPoint + AI)
+• `analyze event` - Analyze a real SailPoint access event  
+• `sailpoint status` - Check SailPoint API connection
+• `history` - View previous audit results
+• `help` - Show this help message
+
+**What I can do:**
+• SOX compliance detection
+• IAM policy violation analysis  
+• Risk assessment and scoring
+• SailPoint data integration
+• Real-time compliance monitoring
+
+**Examples:**
+• "Run audit to check compliance"
+• "Check SailPoint status"
+• "Analyze event" - Uses real SailPoint data
+• "Show me the audit history"
+
+**Data Sources:**
+**SailPoint API** - Live identity and access data (Primary source)
+**AI Model** - Trained Google T5-small for compliance analysis
+**Local Data** - Fallback compliance data
+
+**Tip:** I now use real SailPoint data for event analysis! The system pulls live access records and identity data from your SailPoint API for authentic compliance analysis.
+"""
+
+# Help is the most common static reply, so its JSON body is pre-encoded too
+HELP_RESPONSE = json.dumps({'response': HELP_TEXT}).encode('utf-8')
+
+SAILPOINT_DISCONNECTED_TEXT = """
+**SailPoint API Status**
+
+**Connection:** Disconnected
+**Issue:** Cannot reach SailPoint API
+
+**Troubleshooting:**
+• Check if SailPoint dummy API is running on port 5002
+• Verify network connectivity
+• Try: `cd sailpoint_dummy && python sailpoint_api.py`
+
+**Alternative:** Use local data analysis mode
+"""
+
 @app.route('/test')
 def test():
     """Test route to verify Flask is working"""
@@ -312,11 +684,7 @@ def chat():
         user_message = request.json.get('message', '').strip().lower()
         
         if not user_message:
-            return jsonify({'error': 'Empty message'})
-        
-        # Initialize session chat history
-        if 'chat_history' not in session:
-            session['chat_history'] = []
+            return ojsonify({'error': 'Empty message'})
         
         # Handle different types of queries
         if 'audit' in user_message and ('run' in user_message or 'start' in user_message):
@@ -332,31 +700,55 @@ def chat():
             # Show audit history
             response = handle_history_request()
         elif 'help' in user_message:
-            # Show help
-            response = handle_help_request()
+            # Show help from the pre-encoded response body
+            record_chat_turn({
+                'user': user_message,
+                'assistant': HELP_TEXT,
+                'timestamp': datetime.now().isoformat()
+            })
+            return Response(HELP_RESPONSE, mimetype='application/json')
         else:
             # General compliance question
             response = handle_general_question(user_message)
         
         # Store in chat history
-        session['chat_history'].append({
+        record_chat_turn({
             'user': user_message,
             'assistant': response,
             'timestamp': datetime.now().isoformat()
         })
         
-        return jsonify({'response': response})
+        return ojsonify({'response': response})
         
     except Exception as e:
         logger.error(f"Error handling chat request: {str(e)}")
-        return jsonify({'error': 'An error occurred processing your request'})
+        return ojsonify({'error': 'An error occurred processing your request'})
+
+def record_chat_turn(entry):
+    """Append a chat turn to the session history, keeping only the most recent turns"""
+    if redis_client is not None:
+        # Only the session ID lives in the cookie; history is a capped Redis list that expires with the session
+        key = f"chat:{session.sid}"
+        try:
+            pipe = redis_client.pipeline()
+            pipe.rpush(key, json.dumps(entry))
+            pipe.ltrim(key, -CHAT_HISTORY_LIMIT, -1)
+            pipe.expire(key, app.permanent_session_lifetime)
+            pipe.execute()
+            return
+        except Exception as e:
+            logger.warning(f"Redis chat history unavailable, keeping it in the session: {str(e)}")
+    
+    history = session.get('chat_history', [])
+    history.append(entry)
+    session['chat_history'] = history[-CHAT_HISTORY_LIMIT:]
 
 def handle_audit_request():
     """Handle audit execution requests"""
     try:
         # Try to use orchestrator API first
         try:
-            response = requests.post(f"{ORCHESTRATOR_URL}/api/v1/audit/quick", 
+            response = HTTP.post(f"{ORCHESTRATOR_URL}/api/v1/audit/quick", 
                                    json={"limit": 20}, 
                                    timeout=60)
             
@@ -503,12 +895,18 @@ def handle_analysis_request(message):
         # Try to get real data from SailPoint API
         sample_event = None
         
+        # Fetch the primary source and its fallback at the same time
+        access_result, identity_result = fetch_concurrently(
+            f"{SAILPOINT_URL}/api/v1/access-records?limit=1",
+            f"{SAILPOINT_URL}/api/v1/identities?limit=1"
+        )
+        
         try:
             # First try to get access records from SailPoint
-            response = requests.get(f"{SAILPOINT_URL}/api/v1/access-records", timeout=10)
+            response = unwrap_response(access_result)
             if response.status_code == 200:
                 data = response.json()
-                access_records = data.get('access_records', [])
+                access_records = data.get('data', {}).get('items', [])
                 
                 if access_records:
                     # Use the first access record as sample
@@ -532,10 +930,10 @@ def handle_analysis_request(message):
             logger.warning(f"Could not fetch access records from SailPoint: {str(api_error)}")
             # Try to get identity data as fallback
             try:
-                response = requests.get(f"{SAILPOINT_URL}/api/v1/identities", timeout=10)
+                response = unwrap_response(identity_result)
                 if response.status_code == 200:
                     data = response.json()
-                    identities = data.get('identities', [])
+                    identities = data.get('data', {}).get('items', [])
                     
                     if identities:
                         # Use the first identity as sample
@@ -579,7 +977,7 @@ def handle_analysis_request(message):
                 'confidence': 0.5
             }
         else:
-            analysis = orchestrator.analyze_compliance_event(sample_event)
+            analysis = orchestrator.wait_for_analysis(orchestrator.submit_event(sample_event), sample_event)
         
         status = "COMPLIANT" if analysis['is_compliant'] else "NON-COMPLIANT"
         
@@ -615,11 +1013,37 @@ def handle_analysis_request(message):
         return "Error analyzing event. Please try again."
 
 def handle_sailpoint_status():
-    """Handle SailPoint status check requests"""
+    """Handle SailPoint status check requests, caching the result briefly in Redis"""
+    if redis_client is None:
+        return check_sailpoint_status()
+    
+    try:
+        cached = redis_client.get('chat:sailpoint_status')
+        if cached is not None:
+            return cached.decode('utf-8')
+    except Exception as e:
+        logger.warning(f"Redis status cache unavailable: {str(e)}")
+        return check_sailpoint_status()
+    
+    status_response = check_sailpoint_status()
+    try:
+        redis_client.setex('chat:sailpoint_status', SAILPOINT_STATUS_TTL, status_response)
+    except Exception as e:
+        logger.warning(f"Could not cache SailPoint status: {str(e)}")
+    return status_response
+
+def check_sailpoint_status():
+    """Query the orchestrator and SailPoint APIs for the current SailPoint status"""
     try:
+        # Query the orchestrator and SailPoint directly at the same time
+        orchestrator_result, sailpoint_result = fetch_concurrently(
+            f"{ORCHESTRATOR_URL}/api/v1/sailpoint/status",
+            f"{SAILPOINT_URL}/api/v1/health"
+        )
+        
         # Check orchestrator API
         try:
-            response = requests.get(f"{ORCHESTRATOR_URL}/api/v1/sailpoint/status", timeout=10)
+            response = unwrap_response(orchestrator_result)
             if response.status_code == 200:
                 data = response.json()
                 sailpoint_data = data.get("data", {})
@@ -647,7 +1071,7 @@ def handle_sailpoint_status():
         
         # Direct SailPoint check as fallback
         try:
-            response = requests.get(f"{SAILPOINT_URL}/api/v1/health", timeout=10)
+            response = unwrap_response(sailpoint_result)
             if response.status_code == 200:
                 data = response.json()
                 return f"""
@@ -664,19 +1088,7 @@ Note: Orchestrator API not available, using direct connection.
         except requests.exceptions.RequestException:
             pass
         
-        return """
-**SailPoint API Status**
-
-**Connection:** Disconnected
-**Issue:** Cannot reach SailPoint API
-
-**Troubleshooting:**
-• Check if SailPoint dummy API is running on port 5002
-• Verify network connectivity
-• Try: `cd sailpoint_dummy && python sailpoint_api.py`
-
-**Alternative:** Use local data analysis mode
-"""
+        return SAILPOINT_DISCONNECTED_TEXT
         
     except Exception as e:
         logger.error(f"Error checking SailPoint status: {str(e)}")
@@ -687,12 +1099,13 @@ def handle_history_request():
     if orchestrator is None:
         return "Orchestrator not available. Cannot access audit history."
         
-    if not orchestrator.audit_history:
+    audits = orchestrator.recent_audits(3)  # Show last 3 audits
+    if not audits:
         return "No audit history available. Run an audit first with 'run audit'."
     
     response = "**Audit History:**\n\n"
     
-    for i, audit in enumerate(orchestrator.audit_history[-3:], 1):  # Show last 3 audits
+    for i, audit in enumerate(audits, 1):
         timestamp = datetime.fromisoformat(audit['timestamp']).strftime('%Y-%m-%d %H:%M')
         summary = audit['summary']
         response += f"**Audit #{i}** ({timestamp}):\n"
@@ -702,39 +1115,6 @@ def handle_history_request():
     
     return response
 
-def handle_help_request():
-    """Handle help requests"""
-    return """
-**IAM SOX Compliance Assistant**
-
-**Available Commands:**
-• `run audit` - Execute full compliance audit (SailPoint + AI)
-• `analyze event` - Analyze a real SailPoint access event  
-• `sailpoint status` - Check SailPoint API connection
-• `history` - View previous audit results
-• `help` - Show this help message
-
-**What I can do:**
-• SOX compliance detection
-• IAM policy violation analysis  
-• Risk assessment and scoring
-• SailPoint data integration
-• Real-time compliance monitoring
-
-**Examples:**
-• "Run audit to check compliance"
-• "Check SailPoint status"
-• "Analyze event" - Uses real SailPoint data
-• "Show me the audit history"
-
-**Data Sources:**
-**SailPoint API** - Live identity and access data (Primary source)
-**AI Model** - Trained Google T5-small for compliance analysis
-**Local Data** - Fallback compliance data
-
-**Tip:** I now use real SailPoint data for event analysis! The system pulls live access records and identity data from your SailPoint API for authentic compliance analysis.
-"""
-
 def handle_general_question(message):
     """Handle general compliance questions"""
     if 'sox' in message:
@@ -0,0 +1,22 @@
+"""
+Gunicorn configuration for the chat interface: gunicorn app:app
+
+The app is preloaded so the compliance model is loaded once in the master process and its
+weights are shared copy-on-write across the forked workers instead of loaded once per worker.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5001')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', '4'))
+preload_app = True
+timeout = 120
+
+# Split the cores between workers instead of giving each worker TORCH_NUM_THREADS; set before the
+# preload so app.py's OMP/MKL defaults match, and again in each worker after the fork
+torch_threads = max(1, (os.cpu_count() or 1) // workers)
+os.environ.setdefault('TORCH_NUM_THREADS', str(torch_threads))
+
+def post_fork(server, worker):
+    import torch
+    torch.set_num_threads(int(os.environ['TORCH_NUM_THREADS']))
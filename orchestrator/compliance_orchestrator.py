@@ -7,27 +7,161 @@ Connects to SailPoint API, collects data, and runs compliance checks using the t
 import os
 import sys
 import json
+import argparse
+import asyncio
+import hashlib
+import functools
+import itertools
 import logging
+import shutil
+import tempfile
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
 import time
+from collections import OrderedDict
 
 # Add parent directory to path to import from the main app
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sailpoint_async import AsyncSailPointConnector, HAS_HTTPX, RETRY_ATTEMPTS, RETRY_BACKOFF, RETRY_STATUSES
 
 try:
-    from transformers import T5ForConditionalGeneration, T5Tokenizer
+    from transformers import T5ForConditionalGeneration, T5TokenizerFast
     import torch
     HAS_TRANSFORMERS = True
 except ImportError:
     HAS_TRANSFORMERS = False
     print("Warning: Transformers not available. Using fallback analysis.")
 
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    import pandas as pd
+    HAS_PANDAS = HAS_NUMPY
+except ImportError:
+    HAS_PANDAS = False
+
+try:
+    from numba import njit
+    HAS_NUMBA = HAS_NUMPY
+except ImportError:
+    HAS_NUMBA = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
+if HAS_HTTPX:
+    import httpx
+
+try:
+    import h2
+    HAS_H2 = True
+except ImportError:
+    HAS_H2 = False
+
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
+try:
+    import diskcache
+    HAS_DISKCACHE = True
+except ImportError:
+    HAS_DISKCACHE = False
+
+try:
+    import bitsandbytes
+    HAS_BITSANDBYTES = True
+except ImportError:
+    HAS_BITSANDBYTES = False
+
+try:
+    import onnxruntime
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    HAS_ONNXRUNTIME = True
+except ImportError:
+    HAS_ONNXRUNTIME = False
+
+# Errors a SailPoint call can raise, whichever HTTP client and JSON parser are in use
+REQUEST_ERRORS = (requests.exceptions.RequestException, ValueError) + ((httpx.HTTPError,) if HAS_HTTPX else ())
+STREAM_ERRORS = REQUEST_ERRORS + ((ijson.JSONError,) if HAS_IJSON else ())
+
+# Pooled keep-alive connections per SailPoint client; should cover the API's request threads
+SAILPOINT_POOL_SIZE = int(os.environ.get("SAILPOINT_POOL_SIZE", "16"))
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Number of prompts tokenized and generated together
+AI_BATCH_SIZE = 16
+
+# Prompt length limit in tokens, including the closing </s>
+PROMPT_MAX_TOKENS = 512
+
+# Prompts share their template words and most field values, so token IDs are cached per word
+PROMPT_WORD_CACHE_SIZE = 16384
+
+# Decoding settings for the analyzer; greedy is enough for the keyword checks in _parse_ai_response
+GENERATION_KWARGS = {"max_new_tokens": 64, "num_beams": 1, "do_sample": False}
+
+# Generation is deterministic, so model responses are cached per prompt
+RESPONSE_CACHE_SIZE = 4096
+RESPONSE_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".analyzer_cache")
+
+# Files whose size and mtime identify a local model's weights in cache keys
+MODEL_WEIGHTS_SUFFIXES = (".safetensors", ".bin", ".pt")
+
+# Int8 ONNX Runtime exports are built once per model and reused on later starts
+ONNX_MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".ort_int8")
+
+# Logistic heads over pooled encoder embeddings, stored next to the trained model
+CLASSIFIER_HEADS_FILE = "compliance_heads.json"
+CLASSIFIER_SIGNALS = ("is_compliant", "sox_violation", "sod_violation", "privilege_escalation")
+
+# Keywords _parse_ai_response looks for in model output
+RESPONSE_KEYWORDS = ("compliant", "non-compliant", "sox", "violation", "segregation", "sod", "privilege", "escalation")
+
+def _build_keyword_automaton():
+    """Build an Aho-Corasick automaton over RESPONSE_KEYWORDS, or None if unavailable"""
+    if not HAS_AHOCORASICK:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword in RESPONSE_KEYWORDS:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+KEYWORD_AUTOMATON = _build_keyword_automaton()
+
+def find_keywords(text: str) -> set:
+    """Return the RESPONSE_KEYWORDS present in text (case-insensitive) in a single pass"""
+    lowered = text.lower()
+    if KEYWORD_AUTOMATON is None:
+        return {keyword for keyword in RESPONSE_KEYWORDS if keyword in lowered}
+    return {keyword for _, keyword in KEYWORD_AUTOMATON.iter(lowered)}
+
 class SailPointConnector:
     """
     Connector to SailPoint API for data collection
@@ -43,15 +177,54 @@ class SailPointConnector:
         """
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
-        self.session = requests.Session()
+        self.session = self._create_session()
+    
+    def _create_session(self):
+        """Create one pooled client for every SailPoint call, preferring httpx over requests"""
+        if HAS_HTTPX:
+            # HTTP/2 multiplexes the audit's requests over one connection when SailPoint is served over TLS
+            # Transport retries cover failed connections; _get retries gateway error statuses
+            transport = httpx.HTTPTransport(
+                http2=HAS_H2,
+                retries=RETRY_ATTEMPTS,
+                limits=httpx.Limits(max_connections=SAILPOINT_POOL_SIZE, max_keepalive_connections=SAILPOINT_POOL_SIZE)
+            )
+            return httpx.Client(transport=transport, timeout=self.timeout, headers={"Accept-Encoding": "gzip"})
+        
+        session = requests.Session()
+        
+        # Pooled keep-alive connections, retrying idempotent GETs on transient gateway errors
+        retries = Retry(total=RETRY_ATTEMPTS, backoff_factor=RETRY_BACKOFF, status_forcelist=RETRY_STATUSES, allowed_methods=frozenset({"GET"}))
+        adapter = HTTPAdapter(pool_connections=SAILPOINT_POOL_SIZE, pool_maxsize=SAILPOINT_POOL_SIZE, max_retries=retries)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({"Accept-Encoding": "gzip", "Connection": "keep-alive"})
+        return session
         
+    def _get(self, url: str, **kwargs):
+        """GET through the session, retrying transient gateway errors on httpx as the requests Retry does"""
+        if not HAS_HTTPX:
+            return self.session.get(url, **kwargs)
+        for attempt in range(RETRY_ATTEMPTS):
+            response = self.session.get(url, **kwargs)
+            if response.status_code not in RETRY_STATUSES:
+                return response
+            time.sleep(RETRY_BACKOFF * 2 ** attempt)
+        return self.session.get(url, **kwargs)
+    
+    def _parse_json(self, response) -> Dict[str, Any]:
+        """Decode a JSON response body, using orjson when available"""
+        if HAS_ORJSON:
+            return orjson.loads(response.content)
+        return response.json()
+    
     def health_check(self) -> Dict[str, Any]:
         """Check if SailPoint API is available"""
         try:
-            response = self.session.get(f"{self.base_url}/api/v1/health", timeout=self.timeout)
+            response = self._get(f"{self.base_url}/api/v1/health", timeout=self.timeout)
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return self._parse_json(response)
+        except REQUEST_ERRORS as e:
             logger.error(f"SailPoint API health check failed: {str(e)}")
             return {"status": "unhealthy", "error": str(e)}
     
@@ -64,10 +237,10 @@ class SailPointConnector:
             if filters:
                 params.update(filters)
                 
-            response = self.session.get(f"{self.base_url}/api/v1/identities", params=params, timeout=self.timeout)
+            response = self._get(f"{self.base_url}/api/v1/identities", params=params, timeout=self.timeout)
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return self._parse_json(response)
+        except REQUEST_ERRORS as e:
             logger.error(f"Failed to fetch identities: {str(e)}")
             return {"success": False, "error": str(e)}
     
@@ -80,13 +253,44 @@ class SailPointConnector:
             if filters:
                 params.update(filters)
                 
-            response = self.session.get(f"{self.base_url}/api/v1/access-records", params=params, timeout=self.timeout)
+            response = self._get(f"{self.base_url}/api/v1/access-records", params=params, timeout=self.timeout)
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return self._parse_json(response)
+        except REQUEST_ERRORS as e:
             logger.error(f"Failed to fetch access records: {str(e)}")
             return {"success": False, "error": str(e)}
     
+    def iter_access_records(self, limit: Optional[int] = None, filters: Optional[Dict] = None) -> Iterator[Dict[str, Any]]:
+        """Yield access records as the response streams in, without building the whole document first"""
+        # Streaming needs ijson and the requests session; with httpx the audit uses AsyncSailPointConnector
+        if not HAS_IJSON or HAS_HTTPX:
+            response = self.get_access_records(limit=limit, filters=filters)
+            if not response.get("success"):
+                raise requests.exceptions.RequestException(response.get("error", "Failed to fetch access records"))
+            yield from response["data"]["items"]
+            return
+        
+        params = {}
+        if limit:
+            params['limit'] = limit
+        if filters:
+            params.update(filters)
+        
+        url = f"{self.base_url}/api/v1/access-records"
+        with self.session.get(url, params=params, timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            yield from ijson.items(response.raw, "data.items.item", use_float=True)
+    
+    def get_access_records_streamed(self, limit: Optional[int] = None, filters: Optional[Dict] = None) -> Dict[str, Any]:
+        """Fetch access records through iter_access_records, wrapped in the usual response envelope"""
+        try:
+            items = list(self.iter_access_records(limit=limit, filters=filters))
+            return {"success": True, "data": {"items": items, "count": len(items)}}
+        except STREAM_ERRORS as e:
+            logger.error(f"Failed to stream access records: {str(e)}")
+            return {"success": False, "error": str(e)}
+    
     def get_compliance_violations(self, compliance_type: Optional[str] = None) -> Dict[str, Any]:
         """Fetch compliance violations from SailPoint"""
         try:
@@ -94,20 +298,20 @@ class SailPointConnector:
             if compliance_type:
                 params['type'] = compliance_type
                 
-            response = self.session.get(f"{self.base_url}/api/v1/compliance/violations", params=params, timeout=self.timeout)
+            response = self._get(f"{self.base_url}/api/v1/compliance/violations", params=params, timeout=self.timeout)
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return self._parse_json(response)
+        except REQUEST_ERRORS as e:
             logger.error(f"Failed to fetch compliance violations: {str(e)}")
             return {"success": False, "error": str(e)}
     
     def get_risk_summary(self) -> Dict[str, Any]:
         """Fetch risk summary from SailPoint"""
         try:
-            response = self.session.get(f"{self.base_url}/api/v1/reports/risk-summary", timeout=self.timeout)
+            response = self._get(f"{self.base_url}/api/v1/reports/risk-summary", timeout=self.timeout)
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return self._parse_json(response)
+        except REQUEST_ERRORS as e:
             logger.error(f"Failed to fetch risk summary: {str(e)}")
             return {"success": False, "error": str(e)}
 
@@ -116,11 +320,26 @@ class ComplianceAnalyzer:
     Compliance analyzer using trained T5 model
     """
     
-    def __init__(self, model_path="../trained_compliance_model"):
-        """Initialize compliance analyzer with trained model"""
+    def __init__(self, model_path="../trained_compliance_model", use_full_generate=False):
+        """
+        Initialize compliance analyzer with trained model
+        
+        Args:
+            model_path (str): Path to the trained model, relative to this file
+            use_full_generate (bool): Always run T5 generation, even when classifier heads are available
+        """
         self.model_path = model_path
+        self.use_full_generate = use_full_generate
         self.model = None
         self.tokenizer = None
+        self.classifier_heads = None
+        self.model_source = None
+        self.model_fingerprint = None
+        self.model_backend = None
+        self.response_cache = OrderedDict()
+        self._response_cache_lock = threading.Lock()
+        self.disk_cache = diskcache.Cache(RESPONSE_CACHE_DIR) if HAS_DISKCACHE else None
+        self.encode_word = functools.lru_cache(maxsize=PROMPT_WORD_CACHE_SIZE)(self._encode_word)
         self.load_model()
         
     def load_model(self):
@@ -133,21 +352,189 @@ class ComplianceAnalyzer:
             model_path = os.path.join(os.path.dirname(__file__), self.model_path)
             if os.path.exists(model_path):
                 logger.info(f"Loading trained model from {model_path}")
-                self.tokenizer = T5Tokenizer.from_pretrained(model_path)
-                self.model = T5ForConditionalGeneration.from_pretrained(model_path)
-                self.model.eval()
+                self.tokenizer = T5TokenizerFast.from_pretrained(model_path)
+                self.model = self._load_quantized_model(model_path)
+                self.model_source = model_path
+                self.model_fingerprint = _weights_fingerprint(model_path)
+                self.classifier_heads = self._load_classifier_heads()
                 logger.info("Trained model loaded successfully")
             else:
                 logger.info("Trained model not found, using base model")
-                self.tokenizer = T5Tokenizer.from_pretrained("google/flan-t5-small")
-                self.model = T5ForConditionalGeneration.from_pretrained("google/flan-t5-small")
-                self.model.eval()
+                self.tokenizer = T5TokenizerFast.from_pretrained("google/flan-t5-small")
+                self.model = self._load_quantized_model("google/flan-t5-small")
+                self.model_source = "google/flan-t5-small"
+                self.model_fingerprint = _weights_fingerprint(self.model_source)
                 logger.info("Base model loaded successfully")
         except Exception as e:
             logger.error(f"Error loading model: {str(e)}")
             self.model = None
             self.tokenizer = None
     
+    def _load_quantized_model(self, source: str):
+        """Load T5 with int8 weights: bitsandbytes on GPU, ONNX Runtime or dynamic quantization on CPU"""
+        if torch.cuda.is_available() and HAS_BITSANDBYTES:
+            model = T5ForConditionalGeneration.from_pretrained(source, load_in_8bit=True, device_map="auto")
+            model.eval()
+            self.model_backend = "bitsandbytes"
+            logger.info("Loaded model in 8-bit with bitsandbytes")
+            return model
+        
+        if HAS_ONNXRUNTIME:
+            try:
+                model = self._load_onnx_model(source)
+                self.model_backend = "onnxruntime"
+                logger.info("Loaded int8 ONNX Runtime model")
+                return model
+            except Exception as e:
+                logger.warning(f"ONNX Runtime export failed, using PyTorch: {str(e)}")
+        
+        model = T5ForConditionalGeneration.from_pretrained(source)
+        model.eval()
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model_backend = "torch"
+        logger.info("Applied int8 dynamic quantization")
+        return model
+    
+    def _load_onnx_model(self, source: str):
+        """Export the model to ONNX, quantize each graph to int8 once per set of weights, and load it on the CPU provider"""
+        # Keyed on the weights, so a retrained model or another model with the same name gets a fresh export
+        export_name = f"{os.path.basename(os.path.normpath(source))}-{_weights_fingerprint(source)[:16]}"
+        quantized_dir = os.path.join(ONNX_MODEL_DIR, export_name)
+        if not os.path.isdir(quantized_dir):
+            # Built in scratch directories and renamed into place, so a crash part-way never leaves a
+            # directory that later starts would take for a finished export
+            os.makedirs(ONNX_MODEL_DIR, exist_ok=True)
+            export_dir = tempfile.mkdtemp(prefix=f"{export_name}.fp32-", dir=ONNX_MODEL_DIR)
+            build_dir = tempfile.mkdtemp(prefix=f"{export_name}.int8-", dir=ONNX_MODEL_DIR)
+            try:
+                ORTModelForSeq2SeqLM.from_pretrained(source, export=True).save_pretrained(export_dir)
+                
+                quantization_config = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+                for file_name in sorted(f for f in os.listdir(export_dir) if f.endswith(".onnx")):
+                    quantizer = ORTQuantizer.from_pretrained(export_dir, file_name=file_name)
+                    quantizer.quantize(save_dir=build_dir, quantization_config=quantization_config)
+                
+                try:
+                    os.replace(build_dir, quantized_dir)
+                except OSError:
+                    # Another process finished the same export first; use its copy
+                    if not os.path.isdir(quantized_dir):
+                        raise
+            finally:
+                shutil.rmtree(export_dir, ignore_errors=True)
+                shutil.rmtree(build_dir, ignore_errors=True)
+        
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = os.cpu_count() or 1
+        return ORTModelForSeq2SeqLM.from_pretrained(
+            quantized_dir,
+            provider="CPUExecutionProvider",
+            session_options=session_options
+        )
+    
+    def _classifier_heads_path(self) -> str:
+        """Location of the classifier heads file for the trained model"""
+        return os.path.join(os.path.dirname(__file__), self.model_path, CLASSIFIER_HEADS_FILE)
+    
+    def _load_classifier_heads(self) -> Optional[Dict[str, Any]]:
+        """Load logistic heads trained by train_classifier_heads, if present"""
+        heads_path = self._classifier_heads_path()
+        if not HAS_NUMPY or not os.path.exists(heads_path):
+            return None
+        try:
+            with open(heads_path, 'r') as f:
+                heads = json.load(f)
+            loaded = {
+                signal: (np.asarray(heads[signal]["coef"], dtype=np.float32), float(heads[signal]["intercept"]))
+                for signal in CLASSIFIER_SIGNALS
+            }
+            logger.info(f"Loaded classifier heads from {heads_path}")
+            return loaded
+        except Exception as e:
+            logger.warning(f"Could not load classifier heads: {str(e)}")
+            return None
+    
+    def _encode_word(self, word: str):
+        """Token IDs for one whitespace-delimited word, without special tokens"""
+        return tuple(self.tokenizer(word, add_special_tokens=False).input_ids)
+    
+    def encode_prompts(self, prompts: List[str]):
+        """
+        Tokenize prompts into a padded batch, reusing cached IDs for words seen before
+        
+        T5's SentencePiece pre-tokenizer splits on whitespace, so joining per-word IDs gives the
+        same IDs as tokenizing the whole prompt, without re-encoding the shared template each time.
+        """
+        batch = []
+        for prompt in prompts:
+            ids = list(itertools.chain.from_iterable(map(self.encode_word, prompt.split())))[:PROMPT_MAX_TOKENS - 1]
+            ids.append(self.tokenizer.eos_token_id)
+            batch.append(ids)
+        return self.tokenizer.pad({"input_ids": batch}, return_tensors="pt")
+    
+    def embed(self, prompts: List[str]):
+        """Mean-pooled encoder embeddings for prompts, shape (len(prompts), d_model)"""
+        embeddings = []
+        encoder = self.model.get_encoder()
+        for start in range(0, len(prompts), AI_BATCH_SIZE):
+            inputs = self.encode_prompts(prompts[start:start + AI_BATCH_SIZE]).to(self.model.device)
+            
+            with torch.no_grad():
+                hidden = encoder(input_ids=inputs['input_ids'], attention_mask=inputs['attention_mask']).last_hidden_state
+            
+            # Average over real tokens only, ignoring padding
+            mask = inputs['attention_mask'].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+            embeddings.append(pooled.float().cpu().numpy())
+        
+        if not embeddings:
+            return np.zeros((0, self.model.config.d_model), dtype=np.float32)
+        return np.concatenate(embeddings)
+    
+    def train_classifier_heads(self, prompts: List[str]) -> str:
+        """
+        Fit one logistic head per signal on the current generate-and-parse pipeline's labels
+        
+        Args:
+            prompts (List[str]): Identity/access prompts to label and train on
+        
+        Returns:
+            str: Path of the saved heads file
+        """
+        from sklearn.linear_model import LogisticRegression
+        
+        labels = np.array([self._response_signals(r) for r in self.analyze_batch(prompts)], dtype=bool)
+        features = self.embed(prompts)
+        
+        heads = {}
+        for i, signal in enumerate(CLASSIFIER_SIGNALS):
+            target = labels[:, i]
+            if target.all() or not target.any():
+                # Only one class seen; store a constant head
+                heads[signal] = {"coef": [0.0] * features.shape[1], "intercept": 10.0 if target.all() else -10.0}
+                continue
+            clf = LogisticRegression(max_iter=1000).fit(features, target)
+            heads[signal] = {"coef": clf.coef_[0].tolist(), "intercept": float(clf.intercept_[0])}
+        
+        heads_path = self._classifier_heads_path()
+        with open(heads_path, 'w') as f:
+            json.dump(heads, f)
+        self.classifier_heads = self._load_classifier_heads()
+        logger.info(f"Saved classifier heads to {heads_path}")
+        return heads_path
+    
+    def classify_batch(self, prompts: List[str]) -> List[Dict[str, float]]:
+        """Probability of each signal per prompt, from the classifier heads"""
+        features = self.embed(prompts)
+        probabilities = {
+            signal: 1.0 / (1.0 + np.exp(-(features @ coef + intercept)))
+            for signal, (coef, intercept) in self.classifier_heads.items()
+        }
+        return [
+            {signal: float(probabilities[signal][i]) for signal in CLASSIFIER_SIGNALS}
+            for i in range(len(prompts))
+        ]
+    
     def analyze_identity_risk(self, identity: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze identity risk using AI model"""
         try:
@@ -181,6 +568,84 @@ class ComplianceAnalyzer:
             logger.error(f"Error analyzing access record: {str(e)}")
             return self._default_analysis()
     
+    def analyze_identities(self, identities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Analyze identity risk for many identities, batching model calls"""
+        return self._analyze_records(identities, self._create_identity_prompt, self._rule_based_identity_analysis_batch)
+    
+    def analyze_access_records(self, access_records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Analyze compliance for many access records, batching model calls"""
+        return self._analyze_records(access_records, self._create_access_prompt, self._rule_based_access_analysis_batch)
+    
+    def analyze_batch(self, prompts: List[str]) -> List[str]:
+        """Generate model responses for prompts in padded batches, skipping cached prompts"""
+        responses = [self._get_cached_response(prompt) for prompt in prompts]
+        pending = [i for i, response in enumerate(responses) if response is None]
+        
+        for start in range(0, len(pending), AI_BATCH_SIZE):
+            batch = pending[start:start + AI_BATCH_SIZE]
+            inputs = self.encode_prompts([prompts[i] for i in batch]).to(self.model.device)
+            
+            with torch.no_grad():
+                outputs = self.model.generate(
+                    inputs['input_ids'],
+                    attention_mask=inputs['attention_mask'],
+                    **GENERATION_KWARGS
+                )
+            
+            for i, response in zip(batch, self.tokenizer.batch_decode(outputs, skip_special_tokens=True)):
+                responses[i] = response
+                self._cache_response(prompts[i], response)
+        return responses
+    
+    def _response_cache_key(self, prompt: str) -> str:
+        """Stable cache key for a prompt under the current model weights and decoding settings"""
+        return hashlib.blake2b(f"{self.model_fingerprint}\0{self.model_backend}\0{sorted(GENERATION_KWARGS.items())}\0{prompt}".encode('utf-8')).hexdigest()
+    
+    def _get_cached_response(self, prompt: str) -> Optional[str]:
+        """Look up a model response in the in-memory LRU, then the disk cache"""
+        key = self._response_cache_key(prompt)
+        with self._response_cache_lock:
+            if key in self.response_cache:
+                self.response_cache.move_to_end(key)
+                return self.response_cache[key]
+        if self.disk_cache is not None:
+            response = self.disk_cache.get(key)
+            if response is not None:
+                self._remember_response(key, response)
+                return response
+        return None
+    
+    def _cache_response(self, prompt: str, response: str):
+        """Store a model response in the in-memory LRU and the disk cache"""
+        key = self._response_cache_key(prompt)
+        self._remember_response(key, response)
+        if self.disk_cache is not None:
+            self.disk_cache.set(key, response)
+    
+    def _remember_response(self, key: str, response: str):
+        """Insert into the in-memory LRU, evicting the oldest entry when full"""
+        with self._response_cache_lock:
+            self.response_cache[key] = response
+            self.response_cache.move_to_end(key)
+            if len(self.response_cache) > RESPONSE_CACHE_SIZE:
+                self.response_cache.popitem(last=False)
+    
+    def _analyze_records(self, records, create_prompt, rule_based_batch) -> List[Dict[str, Any]]:
+        """Analyze records with one batched model pass, or rule-based when no model is loaded"""
+        if not (self.model and self.tokenizer):
+            return rule_based_batch(records)
+        
+        try:
+            prompts = [create_prompt(record) for record in records]
+            if self.classifier_heads and not self.use_full_generate:
+                # Encoder plus logistic heads; skips the decoder entirely
+                return [self._classifier_analysis(p, record) for p, record in zip(self.classify_batch(prompts), records)]
+            responses = self.analyze_batch(prompts)
+            return [self._parse_ai_response(response, record) for response, record in zip(responses, records)]
+        except Exception as e:
+            logger.error(f"Batched AI analysis failed: {str(e)}")
+            return rule_based_batch(records)
+    
     def _create_identity_prompt(self, identity: Dict[str, Any]) -> str:
         """Create prompt for identity analysis"""
         return f"""
@@ -221,18 +686,7 @@ class ComplianceAnalyzer:
     def _ai_analysis(self, prompt: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """Perform AI-based analysis"""
         try:
-            inputs = self.tokenizer(prompt, return_tensors="pt", max_length=512, truncation=True)
-            
-            with torch.no_grad():
-                outputs = self.model.generate(
-                    inputs['input_ids'],
-                    max_length=256,
-                    num_beams=4,
-                    do_sample=False,
-                    early_stopping=True
-                )
-            
-            response = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
+            response = self.analyze_batch([prompt])[0]
             
             # Parse response and create analysis
             return self._parse_ai_response(response, data)
@@ -241,17 +695,55 @@ class ComplianceAnalyzer:
             logger.error(f"AI analysis failed: {str(e)}")
             return self._rule_based_access_analysis(data)
     
-    def _parse_ai_response(self, response: str, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Parse AI model response into structured analysis"""
-        is_compliant = "compliant" in response.lower() and "non-compliant" not in response.lower()
-        
+    def _response_signals(self, response: str):
+        """Extract the CLASSIFIER_SIGNALS booleans from a model response"""
+        hits = find_keywords(response)
+        is_compliant = "compliant" in hits and "non-compliant" not in hits
+        sox_violation = "sox" in hits and ("violation" in hits or "non-compliant" in hits)
+        sod_violation = "segregation" in hits or "sod" in hits
+        privilege_escalation = "privilege" in hits and "escalation" in hits
+        return is_compliant, sox_violation, sod_violation, privilege_escalation
+    
+    def _signal_violations(self, sox_violation: bool, sod_violation: bool, privilege_escalation: bool) -> List[str]:
+        """Violation labels for the detected signals"""
         violations = []
-        if "sox" in response.lower() and ("violation" in response.lower() or "non-compliant" in response.lower()):
+        if sox_violation:
             violations.append("SOX compliance violation")
-        if "segregation" in response.lower() or "sod" in response.lower():
+        if sod_violation:
             violations.append("Segregation of duties violation")
-        if "privilege" in response.lower() and "escalation" in response.lower():
+        if privilege_escalation:
             violations.append("Privilege escalation risk")
+        return violations
+    
+    def _classifier_analysis(self, probabilities: Dict[str, float], data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a structured analysis from classifier head probabilities"""
+        compliant_probability = probabilities["is_compliant"]
+        is_compliant = compliant_probability >= 0.5
+        violations = self._signal_violations(
+            probabilities["sox_violation"] >= 0.5,
+            probabilities["sod_violation"] >= 0.5,
+            probabilities["privilege_escalation"] >= 0.5
+        )
+        
+        risk_score = data.get('riskScore', 0.5)
+        if not is_compliant:
+            risk_score = max(risk_score, 0.7)
+        
+        return {
+            "is_compliant": is_compliant,
+            "risk_score": risk_score,
+            "violations": violations,
+            "recommendation": "APPROVE" if is_compliant else "INVESTIGATE",
+            "ai_response": f"Classifier analysis: {'Compliant' if is_compliant else 'Non-compliant'}",
+            "confidence": round(max(compliant_probability, 1 - compliant_probability), 2),
+            "analysis_type": "ai_classifier",
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    def _parse_ai_response(self, response: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse AI model response into structured analysis"""
+        is_compliant, sox_violation, sod_violation, privilege_escalation = self._response_signals(response)
+        violations = self._signal_violations(sox_violation, sod_violation, privilege_escalation)
         
         risk_score = data.get('riskScore', 0.5)
         if not is_compliant:
@@ -268,8 +760,9 @@ class ComplianceAnalyzer:
             "timestamp": datetime.now().isoformat()
         }
     
-    def _rule_based_identity_analysis(self, identity: Dict[str, Any]) -> Dict[str, Any]:
-        """Rule-based identity analysis"""
+    def _rule_based_identity_analysis(self, identity: Dict[str, Any], now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Rule-based identity analysis, measured against ``now`` when a batch shares one clock reading"""
+        now = now or datetime.now()
         violations = []
         risk_score = identity.get('riskScore', 0.5)
         
@@ -286,15 +779,10 @@ class ComplianceAnalyzer:
         
         # Check last login
         last_login = identity.get('lastLogin')
-        if last_login:
-            try:
-                last_login_date = datetime.fromisoformat(last_login.replace('Z', '+00:00'))
-                days_since_login = (datetime.now() - last_login_date.replace(tzinfo=None)).days
-                if days_since_login > 90:
-                    violations.append("No login activity for 90+ days")
-                    risk_score += 0.2
-            except:
-                pass
+        last_login_date = _parse_iso(last_login) if isinstance(last_login, str) else None
+        if last_login_date and (now - last_login_date).days > 90:
+            violations.append("No login activity for 90+ days")
+            risk_score += 0.2
         
         is_compliant = len(violations) == 0 and risk_score <= 0.5
         
@@ -306,7 +794,7 @@ class ComplianceAnalyzer:
             "ai_response": f"Rule-based analysis: {'Compliant' if is_compliant else 'Non-compliant'}",
             "confidence": 0.75,
             "analysis_type": "rule_based",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now.isoformat()
         }
     
     def _rule_based_access_analysis(self, access_record: Dict[str, Any]) -> Dict[str, Any]:
@@ -351,6 +839,70 @@ class ComplianceAnalyzer:
             "timestamp": datetime.now().isoformat()
         }
     
+    def _rule_based_identity_analysis_batch(self, identities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Rule-based identity analysis over a whole batch with column-wise pandas operations"""
+        if not HAS_PANDAS:
+            now = datetime.now()
+            return [self._rule_based_identity_analysis(identity, now=now) for identity in identities]
+        if not identities:
+            return []
+        
+        df = pd.json_normalize(identities)
+        risk = _column(df, "riskScore", 0.5).fillna(0.5).astype(float)
+        
+        terminated = _column(df, "status").eq("Terminated").to_numpy()
+        risk = risk + np.where(terminated, 0.5, 0.0)
+        high_risk = (risk > 0.7).to_numpy()
+        restricted = _column(df, "attributes.clearanceLevel").eq("Restricted").to_numpy()
+        
+        # Compare wall-clock times with any UTC offset dropped, as the per-record check does
+        last_login = pd.to_datetime(
+            _column(df, "lastLogin").astype("string").str.replace(r"(Z|[+-]\d{2}:?\d{2})$", "", regex=True),
+            errors="coerce",
+            format="ISO8601"
+        )
+        stale = ((pd.Timestamp(datetime.now()) - last_login).dt.days > 90).fillna(False).to_numpy(dtype=bool)
+        risk = risk + np.where(stale, 0.2, 0.0)
+        
+        violations = _violation_lists(len(df), [
+            (terminated, "Terminated user with active accounts"),
+            (high_risk, "High risk score"),
+            (restricted, "Restricted clearance requires review"),
+            (stale, "No login activity for 90+ days")
+        ])
+        return _rule_based_results(risk.to_numpy(), violations)
+    
+    def _rule_based_access_analysis_batch(self, access_records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Rule-based access analysis over a whole batch with column-wise pandas operations"""
+        if not HAS_PANDAS:
+            return [self._rule_based_access_analysis(record) for record in access_records]
+        if not access_records:
+            return []
+        
+        df = pd.json_normalize(access_records)
+        checks = []
+        weights = []
+        
+        # Compliance flags, in the order the records list them
+        for column in [c for c in df.columns if c.startswith("compliance.")]:
+            violated = ~df[column].fillna(True).astype(bool).to_numpy()
+            checks.append((violated, f"{column.split('.', 1)[1].upper()} compliance violation"))
+            weights.append(0.2)
+        
+        # Other risk factors
+        for mask, label, weight in (
+            (_column(df, "violatesSOD", False).fillna(False).astype(bool).to_numpy(), "Segregation of duties violation", 0.3),
+            (_column(df, "isPrivileged", False).fillna(False).astype(bool).to_numpy(), "Privileged access requires review", 0.2),
+            (_column(df, "certificationStatus").eq("Expired").to_numpy(), "Expired certification", 0.2),
+            (_column(df, "riskLevel").eq("High").to_numpy(), "High risk access", 0.2)
+        ):
+            checks.append((mask, label))
+            weights.append(weight)
+        
+        masks = np.column_stack([mask for mask, _ in checks])
+        risk = _score_rule_flags(np.full(len(df), 0.3), masks, np.array(weights))
+        return _rule_based_results(risk, _violation_lists(len(df), checks))
+    
     def _default_analysis(self) -> Dict[str, Any]:
         """Default analysis when all else fails"""
         return {
@@ -364,6 +916,79 @@ class ComplianceAnalyzer:
             "timestamp": datetime.now().isoformat()
         }
 
+def _weights_fingerprint(source: str) -> str:
+    """Hex digest identifying a model's weights: a hub model by name, a local directory by its weight files' sizes and mtimes"""
+    if not os.path.isdir(source):
+        return hashlib.blake2b(source.encode('utf-8'), digest_size=16).hexdigest()
+    parts = [os.path.abspath(source)]
+    for name in sorted(os.listdir(source)):
+        if name.endswith(MODEL_WEIGHTS_SUFFIXES):
+            stat = os.stat(os.path.join(source, name))
+            parts.append(f"{name}:{stat.st_size}:{stat.st_mtime_ns}")
+    return hashlib.blake2b("\0".join(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+@functools.lru_cache(maxsize=4096)
+def _parse_iso(value: str) -> Optional[datetime]:
+    """Parse an ISO timestamp to a naive datetime, dropping any UTC offset; None if unparseable"""
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+def _score_rule_flags_numpy(base, masks, weights):
+    """Add each flag's weight to the base risk score, one flag column at a time"""
+    risk = base
+    for j in range(masks.shape[1]):
+        risk = risk + np.where(masks[:, j], weights[j], 0.0)
+    return risk
+
+if HAS_NUMBA:
+    # Serial on purpose: it runs from concurrent request threads, where numba's parallel layers
+    # are not thread-safe, and the batches are too small to repay a parallel launch
+    @njit(cache=True)
+    def _score_rule_flags(base, masks, weights):
+        """Add each flag's weight to the base risk score in one compiled pass"""
+        risk = base.copy()
+        for i in range(masks.shape[0]):
+            for j in range(masks.shape[1]):
+                if masks[i, j]:
+                    risk[i] += weights[j]
+        return risk
+else:
+    _score_rule_flags = _score_rule_flags_numpy
+
+def _column(df, name: str, default=None):
+    """Return a DataFrame column, or a column filled with default when absent"""
+    if name in df:
+        return df[name]
+    return pd.Series(default, index=df.index, dtype=object)
+
+def _violation_lists(count: int, checks) -> List[List[str]]:
+    """Build per-row violation lists from (mask, label) pairs, preserving check order"""
+    violations = [[] for _ in range(count)]
+    for mask, label in checks:
+        for i in np.flatnonzero(mask):
+            violations[i].append(label)
+    return violations
+
+def _rule_based_results(risk, violations: List[List[str]]) -> List[Dict[str, Any]]:
+    """Assemble rule-based analysis dicts from a risk array and violation lists"""
+    timestamp = datetime.now().isoformat()
+    results = []
+    for risk_score, record_violations in zip(risk.tolist(), violations):
+        is_compliant = len(record_violations) == 0 and risk_score <= 0.5
+        results.append({
+            "is_compliant": is_compliant,
+            "risk_score": min(risk_score, 1.0),
+            "violations": record_violations,
+            "recommendation": "APPROVE" if is_compliant else "INVESTIGATE",
+            "ai_response": f"Rule-based analysis: {'Compliant' if is_compliant else 'Non-compliant'}",
+            "confidence": 0.75,
+            "analysis_type": "rule_based",
+            "timestamp": timestamp
+        })
+    return results
+
 class ComplianceOrchestrator:
     """
     Main orchestrator that coordinates data collection and compliance analysis
@@ -391,10 +1016,7 @@ class ComplianceOrchestrator:
         audit_start = datetime.now()
         
         # Collect data from SailPoint
-        identities_response = self.sailpoint.get_identities(limit=limit)
-        access_response = self.sailpoint.get_access_records(limit=limit)
-        violations_response = self.sailpoint.get_compliance_violations()
-        risk_summary_response = self.sailpoint.get_risk_summary()
+        identities_response, access_response, violations_response, risk_summary_response = self._collect_audit_data(limit)
         
         if not identities_response.get("success") or not access_response.get("success"):
             return {
@@ -404,39 +1026,33 @@ class ComplianceOrchestrator:
             }
         
         # Analyze identities
-        identity_results = []
         identities = identities_response["data"]["items"]
         
         logger.info(f"Analyzing {len(identities)} identities...")
-        for identity in identities:
-            analysis = self.analyzer.analyze_identity_risk(identity)
-            identity_results.append({
-                "identity": identity,
-                "analysis": analysis
-            })
+        identity_results = [
+            {"identity": identity, "analysis": analysis}
+            for identity, analysis in zip(identities, self.analyzer.analyze_identities(identities))
+        ]
         
         # Analyze access records
-        access_results = []
         access_records = access_response["data"]["items"]
         
         logger.info(f"Analyzing {len(access_records)} access records...")
-        for access_record in access_records:
-            analysis = self.analyzer.analyze_access_compliance(access_record)
-            access_results.append({
-                "access_record": access_record,
-                "analysis": analysis
-            })
+        access_results = [
+            {"access_record": access_record, "analysis": analysis}
+            for access_record, analysis in zip(access_records, self.analyzer.analyze_access_records(access_records))
+        ]
         
         # Generate summary
         audit_end = datetime.now()
         
         total_identities = len(identity_results)
-        compliant_identities = len([r for r in identity_results if r["analysis"]["is_compliant"]])
+        compliant_identities = sum(1 for r in identity_results if r["analysis"]["is_compliant"])
         
         total_access = len(access_results)
-        compliant_access = len([r for r in access_results if r["analysis"]["is_compliant"]])
+        compliant_access = sum(1 for r in access_results if r["analysis"]["is_compliant"])
         
-        high_risk_items = len([r for r in identity_results + access_results if r["analysis"]["risk_score"] > 0.7])
+        high_risk_items = sum(1 for r in itertools.chain(identity_results, access_results) if r["analysis"]["risk_score"] > 0.7)
         
         audit_result = {
             "status": "completed",
@@ -471,6 +1087,23 @@ class ComplianceOrchestrator:
         logger.info(f"Audit completed: {audit_result['summary']['overall_compliance_rate']} overall compliance")
         return audit_result
     
+    def _collect_audit_data(self, limit: Optional[int]):
+        """Fetch identities, access records, violations and risk summary from SailPoint"""
+        if HAS_HTTPX:
+            return asyncio.run(self._collect_audit_data_async(limit))
+        
+        return (
+            self.sailpoint.get_identities(limit=limit),
+            self.sailpoint.get_access_records_streamed(limit=limit),
+            self.sailpoint.get_compliance_violations(),
+            self.sailpoint.get_risk_summary()
+        )
+    
+    async def _collect_audit_data_async(self, limit: Optional[int]):
+        """Fetch all audit data concurrently over one async client"""
+        async with AsyncSailPointConnector(self.sailpoint.base_url, self.sailpoint.timeout) as connector:
+            return await connector.collect_audit_data(limit)
+    
     def get_identity_details(self, identity_id: str) -> Dict[str, Any]:
         """Get detailed analysis for a specific identity"""
         # Get identity from SailPoint
@@ -489,12 +1122,11 @@ class ComplianceOrchestrator:
         
         access_analyses = []
         if access_response.get("success"):
-            for access_record in access_response["data"]["items"]:
-                analysis = self.analyzer.analyze_access_compliance(access_record)
-                access_analyses.append({
-                    "access_record": access_record,
-                    "analysis": analysis
-                })
+            access_records = access_response["data"]["items"]
+            access_analyses = [
+                {"access_record": access_record, "analysis": analysis}
+                for access_record, analysis in zip(access_records, self.analyzer.analyze_access_records(access_records))
+            ]
         
         return {
             "identity": identity,
@@ -503,39 +1135,124 @@ class ComplianceOrchestrator:
             "timestamp": datetime.now().isoformat()
         }
     
+    def get_identity_details_bulk(self, identity_ids: List[str]) -> Dict[str, Any]:
+        """Get detailed analysis for many identities from one identity fetch and one access-record fetch"""
+        identity_response = self.sailpoint.get_identities()
+        if not identity_response.get("success"):
+            error = identity_response.get("error", "Failed to fetch identities")
+            return {"results": {}, "errors": {identity_id: error for identity_id in identity_ids}}
+        
+        identities_by_id = {identity.get("id"): identity for identity in identity_response["data"]["items"]}
+        found = [identity_id for identity_id in dict.fromkeys(identity_ids) if identity_id in identities_by_id]
+        errors = {identity_id: "Identity not found" for identity_id in identity_ids if identity_id not in identities_by_id}
+        
+        # Group the access records of the requested identities in a single pass
+        access_by_identity = {identity_id: [] for identity_id in found}
+        access_response = self.sailpoint.get_access_records()
+        if access_response.get("success"):
+            for access_record in access_response["data"]["items"]:
+                records = access_by_identity.get(access_record.get("identityId"))
+                if records is not None:
+                    records.append(access_record)
+        
+        identities = [identities_by_id[identity_id] for identity_id in found]
+        identity_analyses = self.analyzer.analyze_identities(identities)
+        access_records = list(itertools.chain.from_iterable(access_by_identity[identity_id] for identity_id in found))
+        access_analyses = iter(self.analyzer.analyze_access_records(access_records))
+        
+        timestamp = datetime.now().isoformat()
+        results = {}
+        for identity_id, identity, identity_analysis in zip(found, identities, identity_analyses):
+            results[identity_id] = {
+                "identity": identity,
+                "identity_analysis": identity_analysis,
+                "access_records": [
+                    {"access_record": access_record, "analysis": next(access_analyses)}
+                    for access_record in access_by_identity[identity_id]
+                ],
+                "timestamp": timestamp
+            }
+        
+        return {"results": results, "errors": errors}
+    
     def _generate_recommendations(self, identity_results: List[Dict], access_results: List[Dict]) -> List[str]:
         """Generate recommendations based on audit results"""
         recommendations = []
         
         # Identity recommendations
-        high_risk_identities = [r for r in identity_results if r["analysis"]["risk_score"] > 0.7]
+        high_risk_identities = sum(1 for r in identity_results if r["analysis"]["risk_score"] > 0.7)
         if high_risk_identities:
-            recommendations.append(f"Review {len(high_risk_identities)} high-risk identities")
+            recommendations.append(f"Review {high_risk_identities} high-risk identities")
         
-        terminated_users = [r for r in identity_results if r["identity"].get("status") == "Terminated"]
+        terminated_users = sum(1 for r in identity_results if r["identity"].get("status") == "Terminated")
         if terminated_users:
-            recommendations.append(f"Disable access for {len(terminated_users)} terminated users")
+            recommendations.append(f"Disable access for {terminated_users} terminated users")
         
         # Access recommendations
-        sod_violations = [r for r in access_results if "segregation" in " ".join(r["analysis"]["violations"]).lower()]
+        sod_violations = sum(1 for r in access_results if any("segregation" in v.lower() for v in r["analysis"]["violations"]))
         if sod_violations:
-            recommendations.append(f"Address {len(sod_violations)} segregation of duties violations")
+            recommendations.append(f"Address {sod_violations} segregation of duties violations")
         
-        expired_certs = [r for r in access_results if r["access_record"].get("certificationStatus") == "Expired"]
+        expired_certs = sum(1 for r in access_results if r["access_record"].get("certificationStatus") == "Expired")
         if expired_certs:
-            recommendations.append(f"Renew {len(expired_certs)} expired certifications")
+            recommendations.append(f"Renew {expired_certs} expired certifications")
         
-        privileged_access = [r for r in access_results if r["access_record"].get("isPrivileged")]
+        privileged_access = sum(1 for r in access_results if r["access_record"].get("isPrivileged"))
         if privileged_access:
-            recommendations.append(f"Review {len(privileged_access)} privileged access grants")
+            recommendations.append(f"Review {privileged_access} privileged access grants")
         
         if not recommendations:
             recommendations.append("No major compliance issues detected")
         
         return recommendations
 
+# Orchestrator owned by an audit worker process, built once by init_audit_worker
+_worker_orchestrator = None
+
+def init_audit_worker(sailpoint_url: str, model_path: str):
+    """Process pool initializer: load the orchestrator and model once per worker process"""
+    global _worker_orchestrator
+    _worker_orchestrator = ComplianceOrchestrator(sailpoint_url=sailpoint_url, model_path=model_path)
+
+def run_audit_in_worker(limit: Optional[int]) -> Dict[str, Any]:
+    """Run a full compliance audit on the worker process's orchestrator"""
+    return _worker_orchestrator.run_full_compliance_audit(limit=limit)
+
+def train_heads(limit: Optional[int]):
+    """Label SailPoint identities and access records with the trained model and fit the classifier heads on them"""
+    print("🚀 Training classifier heads...")
+    
+    orchestrator = ComplianceOrchestrator()
+    analyzer = orchestrator.analyzer
+    # The heads are saved next to, and only loaded with, the trained model
+    if analyzer.model is None or not os.path.isdir(os.path.dirname(analyzer._classifier_heads_path())):
+        print("Trained model not available; classifier heads are only used with the trained model")
+        return
+    
+    identities_response, access_response, _, _ = orchestrator._collect_audit_data(limit)
+    if not identities_response.get("success") or not access_response.get("success"):
+        print("Failed to collect data from SailPoint")
+        print("Make sure the SailPoint dummy API is running on port 5002")
+        return
+    
+    prompts = [analyzer._create_identity_prompt(identity) for identity in identities_response["data"]["items"]]
+    prompts += [analyzer._create_access_prompt(record) for record in access_response["data"]["items"]]
+    print(f"Labelling {len(prompts)} prompts with full generation (this is the slow part)...")
+    heads_path = analyzer.train_classifier_heads(prompts)
+    print(f"Saved classifier heads to {heads_path}")
+
 def main():
     """Main function for testing the orchestrator"""
+    parser = argparse.ArgumentParser(description="Compliance orchestrator")
+    parser.add_argument("--train-heads", action="store_true",
+                        help="Fit the classifier heads from SailPoint data instead of running a sample audit")
+    parser.add_argument("--limit", type=int, default=500,
+                        help="Identities and access records each to train the classifier heads on")
+    args = parser.parse_args()
+    if args.train_heads:
+        train_heads(args.limit)
+        return
+    
     print("🚀 Starting Compliance Orchestrator...")
     
     # Initialize orchestrator
@@ -0,0 +1,17 @@
+"""
+Gunicorn configuration for the orchestrator API: gunicorn orchestrator_api:app
+
+Audit state lives in the process, so the API runs as one worker and gets its concurrency from
+threads; the audits themselves run in a separate worker process.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5003')}"
+workers = 1
+worker_class = "gthread"
+threads = int(os.environ.get('ORCHESTRATOR_THREADS', '8'))
+
+# Keep enough pooled SailPoint connections for every request thread
+os.environ.setdefault('SAILPOINT_POOL_SIZE', str(max(16, threads)))
+timeout = 120
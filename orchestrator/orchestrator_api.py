@@ -7,16 +7,34 @@ Provides REST API endpoints for the compliance orchestrator
 import os
 import sys
 import json
+import uuid
+import hashlib
 import logging
+import multiprocessing
 from datetime import datetime
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, has_request_context, jsonify, request, stream_with_context
 import threading
 import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 # Add current directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from compliance_orchestrator import ComplianceOrchestrator
+from compliance_orchestrator import ComplianceOrchestrator, init_audit_worker, run_audit_in_worker
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    from waitress import serve
+    HAS_WAITRESS = True
+except ImportError:
+    HAS_WAITRESS = False
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -24,13 +42,108 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
+def dump_json(obj):
+    """Serialize obj to JSON bytes, using orjson when available"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+@app.before_request
+def stamp_request():
+    """Read the clock once per request; handlers share the formatted timestamp"""
+    g.now_iso = datetime.now().isoformat()
+
+def request_timestamp():
+    """The current request's timestamp, or the current time outside a request"""
+    return g.now_iso if has_request_context() else datetime.now().isoformat()
+
+def not_modified(etag):
+    """304 response when the client's If-None-Match already holds etag, else None"""
+    if etag and request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        with_etag(response, etag)
+        return response
+    return None
+
+def with_etag(response, etag):
+    """Mark a response as revalidatable against a weak ETag"""
+    response.set_etag(etag, weak=True)
+    response.headers["Cache-Control"] = "private, must-revalidate"
+    return response
+
+# Size of the chunks a streamed JSON response is written in
+STREAM_CHUNK_SIZE = 1 << 16
+
+def iter_json(obj, depth=3):
+    """Yield obj as JSON byte fragments, encoding nested dicts and lists piece by piece down to depth"""
+    if depth == 0 or not isinstance(obj, (dict, list)):
+        yield dump_json(obj)
+    elif isinstance(obj, dict):
+        yield b'{'
+        for i, (key, value) in enumerate(obj.items()):
+            yield (b',' if i else b'') + dump_json(str(key)) + b':'
+            yield from iter_json(value, depth - 1)
+        yield b'}'
+    else:
+        yield b'['
+        for i, value in enumerate(obj):
+            if i:
+                yield b','
+            yield from iter_json(value, depth - 1)
+        yield b']'
+
+def coalesce(fragments, size=STREAM_CHUNK_SIZE):
+    """Group small byte fragments into chunks of about size bytes, so each write carries real payload"""
+    buffer = bytearray()
+    for fragment in fragments:
+        buffer += fragment
+        if len(buffer) >= size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+# Seconds a SailPoint health result is reused before asking SailPoint again
+HEALTH_CACHE_TTL = 5
+
+# Most identities accepted by one bulk identity request
+MAX_BATCH_IDENTITIES = 500
+
+# Longest a status request may block waiting for the audit to change state
+MAX_STATUS_WAIT = 60
+
+# Status requests that may block at once (long-polls and event streams), so watchers can never
+# hold all 8 server threads and starve the other routes
+MAX_STATUS_WATCHERS = 4
+
+# Milliseconds an EventSource waits before reconnecting, instead of the browser's ~3 s default
+STATUS_STREAM_RETRY_MS = 30000
+
+# Identity details kept between audits, keyed by identity ID and audit version
+IDENTITY_CACHE_SIZE = 1024
+
+# Everything a status reader needs, replaced as a whole on each transition so reads never mix states
+AuditSnapshot = namedtuple("AuditSnapshot", ["status", "version", "audit", "audit_json", "etag"])
+
 class OrchestratorService:
     """Service wrapper for the compliance orchestrator"""
     
     def __init__(self):
         self.orchestrator = None
-        self.current_audit = None
-        self.audit_status = "idle"
+        self.snapshot = AuditSnapshot("idle", 0, None, b"null", None)
+        # Distinguishes this process's identity ETags from those of an earlier run
+        self._etag_salt = uuid.uuid4().hex
+        self._health_cache = {"ts": 0.0, "val": None}
+        self._health_lock = threading.Lock()
+        self._id_cache = OrderedDict()
+        self._id_cache_lock = threading.Lock()
+        self._audit_version = 0
+        self._status_changed = threading.Condition()
+        self._status_watchers = threading.BoundedSemaphore(MAX_STATUS_WATCHERS)
+        self._audit_pool = None
+        self._audit_future = None
+        # Guards audit state transitions; reentrant because a done-callback can run inside start_audit
+        self._state_lock = threading.RLock()
         self.initialize_orchestrator()
     
     def initialize_orchestrator(self):
@@ -44,59 +157,202 @@ class OrchestratorService:
     
     def start_audit(self, limit=50):
         """Start an audit in the background"""
-        if self.audit_status == "running":
-            return {"status": "error", "message": "Audit already in progress"}
-        
-        if not self.orchestrator:
-            return {"status": "error", "message": "Orchestrator not available"}
-        
-        self.audit_status = "running"
-        self.current_audit = None
-        
-        # Run audit in background thread
-        audit_thread = threading.Thread(target=self._run_audit_background, args=(limit,))
-        audit_thread.daemon = True
-        audit_thread.start()
+        with self._state_lock:
+            if self.snapshot.status == "running":
+                return {"status": "error", "message": "Audit already in progress"}
+            
+            if not self.orchestrator:
+                return {"status": "error", "message": "Orchestrator not available"}
+            
+            self._publish("running", None)
+            
+            # Run audit in a worker process so its CPU work does not hold the GIL against request handlers
+            try:
+                self._audit_future = self._get_audit_pool().submit(run_audit_in_worker, limit)
+            except (BrokenProcessPool, RuntimeError) as e:
+                self._audit_pool = None
+                self._audit_failed(e)
+                return {"status": "error", "message": f"Could not start audit worker: {str(e)}"}
+            self._audit_future.add_done_callback(self._on_audit_done)
         
         return {
             "status": "started",
             "message": "Audit started in background",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": request_timestamp()
         }
     
-    def _run_audit_background(self, limit):
-        """Run audit in background thread"""
+    def _get_audit_pool(self):
+        """Single-worker process pool that loads its own orchestrator from this one's settings"""
+        if self._audit_pool is None:
+            # Spawn rather than fork: this process has request threads, held locks, pooled connections
+            # and torch/OpenMP runtimes that a forked child would inherit in an inconsistent state
+            self._audit_pool = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_audit_worker,
+                initargs=(self.orchestrator.sailpoint.base_url, self.orchestrator.analyzer.model_path)
+            )
+        return self._audit_pool
+    
+    def _on_audit_done(self, future):
+        """Record the outcome of a background audit once its worker finishes"""
         try:
-            result = self.orchestrator.run_full_compliance_audit(limit=limit)
-            self.current_audit = result
-            self.audit_status = "completed"
-            logger.info("Background audit completed")
+            result = future.result()
         except Exception as e:
-            logger.error(f"Background audit failed: {str(e)}")
-            self.current_audit = {
-                "status": "error",
-                "message": str(e),
-                "timestamp": datetime.now().isoformat()
-            }
-            self.audit_status = "error"
+            with self._state_lock:
+                if isinstance(e, BrokenProcessPool):
+                    # The worker died; start a fresh pool for the next audit
+                    self._audit_pool = None
+                self._audit_failed(e)
+            return
+        
+        with self._state_lock:
+            self._publish("completed", result)
+            # Identity details computed before this audit are stale now
+            with self._id_cache_lock:
+                self._audit_version += 1
+                self._id_cache.clear()
+        logger.info("Background audit completed")
+    
+    def _audit_failed(self, error):
+        """Record a background audit failure"""
+        logger.error(f"Background audit failed: {str(error)}")
+        self._publish("error", {
+            "status": "error",
+            "message": str(error),
+            "timestamp": request_timestamp()
+        })
+    
+    def _publish(self, status, audit):
+        """Swap in a new snapshot, with the audit encoded once so status reads never re-encode it"""
+        audit_json = dump_json(audit)
+        etag = hashlib.blake2b(audit_json, digest_size=16).hexdigest() if audit is not None else None
+        with self._status_changed:
+            self.snapshot = AuditSnapshot(status, self.snapshot.version + 1, audit, audit_json, etag)
+            self._status_changed.notify_all()
+    
+    def identity_etag(self, identity_id):
+        """ETag for an identity's details, which only change when an audit completes"""
+        return hashlib.blake2b(f"{self._etag_salt}:{self._audit_version}:{identity_id}".encode('utf-8'), digest_size=16).hexdigest()
+    
+    def get_audit_status_json(self, snapshot=None):
+        """Audit status as JSON bytes, splicing in the pre-encoded audit"""
+        snapshot = snapshot or self.snapshot
+        head = dump_json({
+            "status": snapshot.status,
+            "version": snapshot.version,
+            "timestamp": request_timestamp()
+        })
+        return head[:-1] + b',"current_audit":' + snapshot.audit_json + b'}'
+    
+    def wait_for_status_change(self, since, timeout):
+        """Block until the status version moves past since, or timeout elapses"""
+        with self._status_changed:
+            self._status_changed.wait_for(lambda: self.snapshot.version != since, timeout=timeout)
+    
+    def try_watch_status(self):
+        """Claim a blocking status watcher slot; False when all MAX_STATUS_WATCHERS are taken"""
+        return self._status_watchers.acquire(blocking=False)
+    
+    def end_watch_status(self):
+        """Release a slot claimed by try_watch_status"""
+        self._status_watchers.release()
     
     def get_audit_status(self):
         """Get current audit status"""
+        snapshot = self.snapshot
         return {
-            "status": self.audit_status,
-            "current_audit": self.current_audit,
-            "timestamp": datetime.now().isoformat()
+            "status": snapshot.status,
+            "version": snapshot.version,
+            "current_audit": snapshot.audit,
+            "timestamp": request_timestamp()
         }
     
+    def sailpoint_health(self):
+        """SailPoint health, refreshed by at most one request thread per HEALTH_CACHE_TTL"""
+        cached = self._health_cache
+        if cached["val"] is not None and time.monotonic() - cached["ts"] < HEALTH_CACHE_TTL:
+            return cached["val"]
+        
+        # One thread refreshes while the others keep serving the last result; wait only if there is none yet
+        if not self._health_lock.acquire(blocking=cached["val"] is None):
+            return cached["val"]
+        try:
+            cached = self._health_cache
+            if cached["val"] is not None and time.monotonic() - cached["ts"] < HEALTH_CACHE_TTL:
+                return cached["val"]
+            
+            health = self.orchestrator.sailpoint.health_check()
+            if health.get("status") == "unhealthy":
+                # Not cached, so the next request re-checks instead of pinning the outage for the TTL
+                if cached["val"] is not None:
+                    logger.warning(f"SailPoint health check failed, serving last result: {health.get('error')}")
+                    return cached["val"]
+                return health
+            
+            self._health_cache = {"ts": time.monotonic(), "val": health}
+            return health
+        finally:
+            self._health_lock.release()
+    
     def get_identity_details(self, identity_id):
         """Get details for a specific identity"""
         if not self.orchestrator:
             return {"error": "Orchestrator not available"}
         
-        return self.orchestrator.get_identity_details(identity_id)
+        key = (identity_id, self._audit_version)
+        with self._id_cache_lock:
+            if key in self._id_cache:
+                self._id_cache.move_to_end(key)
+                return self._id_cache[key]
+        
+        details = self.orchestrator.get_identity_details(identity_id)
+        if "error" not in details:
+            with self._id_cache_lock:
+                self._id_cache[key] = details
+                self._id_cache.move_to_end(key)
+                if len(self._id_cache) > IDENTITY_CACHE_SIZE:
+                    self._id_cache.popitem(last=False)
+        return details
+    
+    def get_identity_details_bulk(self, identity_ids):
+        """Get details for many identities at once"""
+        if not self.orchestrator:
+            return {"error": "Orchestrator not available"}
+        
+        return self.orchestrator.get_identity_details_bulk(identity_ids)
+
+# Initialize service; a spawned audit worker re-imports this script as __mp_main__ and only needs
+# the orchestrator its pool initializer builds, so it skips the service and its model load
+orchestrator_service = OrchestratorService() if __name__ != "__mp_main__" else None
+
+# Static response parts, built once instead of on every request
+HEALTH_RESPONSE_BASE = {
+    "status": "healthy",
+    "service": "Compliance Orchestrator API",
+    "version": "1.0.0"
+}
 
-# Initialize service
-orchestrator_service = OrchestratorService()
+NOT_FOUND_RESPONSE = json.dumps({
+    "status": "error",
+    "message": "Endpoint not found",
+    "availableEndpoints": [
+        "GET  /api/v1/health",
+        "POST /api/v1/audit/start",
+        "GET  /api/v1/audit/status", 
+        "GET  /api/v1/audit/events",
+        "GET  /api/v1/audit/results",
+        "POST /api/v1/audit/quick",
+        "GET  /api/v1/identity/{id}",
+        "POST /api/v1/identity/batch",
+        "GET  /api/v1/sailpoint/status"
+    ]
+}).encode('utf-8')
+
+INTERNAL_ERROR_RESPONSE = json.dumps({
+    "status": "error",
+    "message": "Internal server error"
+}).encode('utf-8')
 
 @app.route('/api/v1/health', methods=['GET'])
 def health_check():
@@ -105,15 +361,13 @@ def health_check():
     
     if orchestrator_service.orchestrator:
         try:
-            sailpoint_health = orchestrator_service.orchestrator.sailpoint.health_check()
+            sailpoint_health = orchestrator_service.sailpoint_health()
         except Exception as e:
             sailpoint_health = {"status": "error", "error": str(e)}
     
     return jsonify({
-        "status": "healthy",
-        "service": "Compliance Orchestrator API",
-        "version": "1.0.0",
-        "timestamp": datetime.now().isoformat(),
+        **HEALTH_RESPONSE_BASE,
+        "timestamp": g.now_iso,
         "components": {
             "orchestrator": "available" if orchestrator_service.orchestrator else "unavailable",
             "sailpoint": sailpoint_health.get("status", "unknown"),
@@ -136,45 +390,129 @@ def start_audit():
 
 @app.route('/api/v1/audit/status', methods=['GET'])
 def get_audit_status():
-    """Get audit status"""
-    status = orchestrator_service.get_audit_status()
-    return jsonify(status)
+    """Get audit status; with ?wait=N, long-poll up to N seconds for the version to move past ?since"""
+    wait = request.args.get('wait', type=float)
+    # With every watcher slot taken the current status is returned at once and the client polls again
+    if wait and orchestrator_service.try_watch_status():
+        try:
+            since = request.args.get('since', orchestrator_service.snapshot.version, type=int)
+            orchestrator_service.wait_for_status_change(since, min(wait, MAX_STATUS_WAIT))
+        finally:
+            orchestrator_service.end_watch_status()
+    
+    return Response(orchestrator_service.get_audit_status_json(), mimetype='application/json')
+
+@app.route('/api/v1/audit/events', methods=['GET'])
+def stream_audit_status():
+    """Stream audit status changes as Server-Sent Events, kept open across audits"""
+    def events():
+        yield f"retry: {STATUS_STREAM_RETRY_MS}\n\n".encode('utf-8')
+        if not orchestrator_service.try_watch_status():
+            # Every watcher slot is taken: send the current status and let the client reconnect after the retry
+            yield b"data: " + orchestrator_service.get_audit_status_json() + b"\n\n"
+            return
+        
+        try:
+            version = None
+            while True:
+                snapshot = orchestrator_service.snapshot
+                if snapshot.version != version:
+                    yield b"data: " + orchestrator_service.get_audit_status_json(snapshot) + b"\n\n"
+                    version = snapshot.version
+                else:
+                    # Comment line keeps idle connections open through proxies
+                    yield b": keep-alive\n\n"
+                
+                orchestrator_service.wait_for_status_change(version, MAX_STATUS_WAIT)
+        finally:
+            orchestrator_service.end_watch_status()
+    
+    return Response(events(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
 
 @app.route('/api/v1/audit/results', methods=['GET'])
 def get_audit_results():
     """Get latest audit results"""
-    status = orchestrator_service.get_audit_status()
+    snapshot = orchestrator_service.snapshot
     
-    if status["status"] == "completed" and status["current_audit"]:
-        return jsonify({
-            "status": "success",
-            "data": status["current_audit"],
-            "timestamp": datetime.now().isoformat()
-        })
-    elif status["status"] == "running":
+    if snapshot.status == "completed" and snapshot.audit:
+        cached = not_modified(snapshot.etag)
+        if cached:
+            return cached
+        
+        # Envelope around the audit encoded once when it completed, sent as-is without copying it
+        body = [
+            b'{"status":"success","data":', snapshot.audit_json,
+            b',"timestamp":' + dump_json(g.now_iso) + b'}'
+        ]
+        return with_etag(Response(body, mimetype='application/json'), snapshot.etag)
+    elif snapshot.status == "running":
         return jsonify({
             "status": "in_progress",
             "message": "Audit still running",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": g.now_iso
         }), 202
-    elif status["status"] == "error":
+    elif snapshot.status == "error":
         return jsonify({
             "status": "error",
             "message": "Audit failed",
-            "error": status.get("current_audit", {}),
-            "timestamp": datetime.now().isoformat()
+            "error": snapshot.audit or {},
+            "timestamp": g.now_iso
         }), 500
     else:
         return jsonify({
             "status": "not_found",
             "message": "No audit results available",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": g.now_iso
         }), 404
 
+@app.route('/api/v1/identity/batch', methods=['POST'])
+def get_identity_details_batch():
+    """Get detailed analysis for a list of identities in one request"""
+    data = request.get_json(silent=True) or {}
+    identity_ids = data.get('ids')
+    
+    if not isinstance(identity_ids, list) or not all(isinstance(identity_id, str) for identity_id in identity_ids):
+        return jsonify({
+            "status": "error",
+            "message": "Request body must be {\"ids\": [...]} with string identity IDs"
+        }), 400
+    
+    if len(identity_ids) > MAX_BATCH_IDENTITIES:
+        return jsonify({
+            "status": "error",
+            "message": f"At most {MAX_BATCH_IDENTITIES} identities per request"
+        }), 400
+    
+    try:
+        details = orchestrator_service.get_identity_details_bulk(identity_ids)
+        
+        if "error" in details:
+            return jsonify({
+                "status": "error",
+                "message": details["error"]
+            }), 503
+        
+        return jsonify({
+            "status": "success",
+            "data": details,
+            "timestamp": g.now_iso
+        })
+        
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
 @app.route('/api/v1/identity/<identity_id>', methods=['GET'])
 def get_identity_details(identity_id):
     """Get detailed analysis for a specific identity"""
     try:
+        etag = orchestrator_service.identity_etag(identity_id)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
         details = orchestrator_service.get_identity_details(identity_id)
         
         if "error" in details:
@@ -183,11 +521,11 @@ def get_identity_details(identity_id):
                 "message": details["error"]
             }), 404
         
-        return jsonify({
+        return with_etag(jsonify({
             "status": "success",
             "data": details,
-            "timestamp": datetime.now().isoformat()
-        })
+            "timestamp": g.now_iso
+        }), etag)
         
     except Exception as e:
         return jsonify({
@@ -211,11 +549,13 @@ def quick_audit():
         # Run quick audit
         result = orchestrator_service.orchestrator.run_full_compliance_audit(limit=limit)
         
-        return jsonify({
+        # Encode and send the result piece by piece rather than building the whole body first
+        envelope = {
             "status": "success",
             "data": result,
-            "timestamp": datetime.now().isoformat()
-        })
+            "timestamp": g.now_iso
+        }
+        return Response(stream_with_context(coalesce(iter_json(envelope))), mimetype='application/json')
         
     except Exception as e:
         logger.error(f"Quick audit failed: {str(e)}")
@@ -234,11 +574,11 @@ def sailpoint_status():
         }), 503
     
     try:
-        health = orchestrator_service.orchestrator.sailpoint.health_check()
+        health = orchestrator_service.sailpoint_health()
         return jsonify({
             "status": "success",
             "data": health,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": g.now_iso
         })
     except Exception as e:
         return jsonify({
@@ -248,26 +588,11 @@ def sailpoint_status():
 
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({
-        "status": "error",
-        "message": "Endpoint not found",
-        "availableEndpoints": [
-            "GET  /api/v1/health",
-            "POST /api/v1/audit/start",
-            "GET  /api/v1/audit/status", 
-            "GET  /api/v1/audit/results",
-            "POST /api/v1/audit/quick",
-            "GET  /api/v1/identity/{id}",
-            "GET  /api/v1/sailpoint/status"
-        ]
-    }), 404
+    return Response(NOT_FOUND_RESPONSE, status=404, mimetype='application/json')
 
 @app.errorhandler(500)
 def internal_error(error):
-    return jsonify({
-        "status": "error",
-        "message": "Internal server error"
-    }), 500
+    return Response(INTERNAL_ERROR_RESPONSE, status=500, mimetype='application/json')
 
 if __name__ == '__main__':
     print("Starting Compliance Orchestrator API...")
@@ -279,11 +604,17 @@ if __name__ == '__main__':
     print("  GET  /api/v1/health                - Health check")
     print("  POST /api/v1/audit/start           - Start background audit")
     print("  GET  /api/v1/audit/status          - Get audit status")
+    print("  GET  /api/v1/audit/events          - Stream audit status changes")
     print("  GET  /api/v1/audit/results         - Get audit results")
     print("  POST /api/v1/audit/quick           - Run quick audit")
     print("  GET  /api/v1/identity/{id}         - Get identity details")
+    print("  POST /api/v1/identity/batch        - Get details for many identities")
     print("  GET  /api/v1/sailpoint/status      - SailPoint API status")
     print("")
     print("Press Ctrl+C to stop the server")
     
-    app.run(debug=True, host='0.0.0.0', port=5003)
+    # No debug reloader: it would start a second process and load the model twice
+    if HAS_WAITRESS:
+        serve(app, host='0.0.0.0', port=5003, threads=8)
+    else:
+        app.run(debug=False, host='0.0.0.0', port=5003, threaded=True)
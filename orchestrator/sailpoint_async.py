@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Async SailPoint Connector
+Fetches SailPoint data concurrently with httpx so audit data collection overlaps network I/O
+"""
+
+import asyncio
+import logging
+from typing import Dict, Optional, Any
+
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+logger = logging.getLogger(__name__)
+
+# Page size and concurrency for fetching complete collections
+PAGE_SIZE = 500
+MAX_CONCURRENT_PAGES = 8
+
+# Transient gateway errors that idempotent GETs are retried on, with exponential backoff
+RETRY_STATUSES = (502, 503, 504)
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF = 0.2
+
+class AsyncSailPointConnector:
+    """
+    Async connector to SailPoint API, used as an async context manager
+    """
+
+    def __init__(self, base_url="http://localhost:5002", timeout=30):
+        """
+        Initialize async SailPoint connector
+
+        Args:
+            base_url (str): Base URL of SailPoint API
+            timeout (int): Request timeout in seconds
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.client = None
+
+    async def __aenter__(self):
+        self.client = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.client.aclose()
+        self.client = None
+
+    async def _get(self, path: str, params: Optional[Dict] = None, description: str = "data") -> Dict[str, Any]:
+        """GET a SailPoint endpoint, retrying transient gateway errors; returns the error envelope on failure"""
+        try:
+            for attempt in range(RETRY_ATTEMPTS):
+                response = await self.client.get(path, params=params)
+                if response.status_code not in RETRY_STATUSES:
+                    break
+                await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+            else:
+                response = await self.client.get(path, params=params)
+            response.raise_for_status()
+            return orjson.loads(response.content) if HAS_ORJSON else response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            logger.error(f"Failed to fetch {description}: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+    async def get_identities(self, limit: Optional[int] = None, filters: Optional[Dict] = None) -> Dict[str, Any]:
+        """Fetch identities from SailPoint"""
+        params = {}
+        if limit:
+            params['limit'] = limit
+        if filters:
+            params.update(filters)
+        return await self._get("/api/v1/identities", params, "identities")
+
+    async def get_access_records(self, limit: Optional[int] = None, filters: Optional[Dict] = None) -> Dict[str, Any]:
+        """Fetch access records from SailPoint"""
+        params = {}
+        if limit:
+            params['limit'] = limit
+        if filters:
+            params.update(filters)
+        return await self._get("/api/v1/access-records", params, "access records")
+
+    async def get_compliance_violations(self, compliance_type: Optional[str] = None) -> Dict[str, Any]:
+        """Fetch compliance violations from SailPoint"""
+        params = {}
+        if compliance_type:
+            params['type'] = compliance_type
+        return await self._get("/api/v1/compliance/violations", params, "compliance violations")
+
+    async def get_risk_summary(self) -> Dict[str, Any]:
+        """Fetch risk summary from SailPoint"""
+        return await self._get("/api/v1/reports/risk-summary", None, "risk summary")
+
+    async def get_identities_all(self, limit: Optional[int] = None, filters: Optional[Dict] = None) -> Dict[str, Any]:
+        """Fetch identities page by page, with pages after the first requested concurrently"""
+        return await self._get_all_pages("/api/v1/identities", "identities", limit, filters)
+
+    async def get_access_records_all(self, limit: Optional[int] = None, filters: Optional[Dict] = None) -> Dict[str, Any]:
+        """Fetch access records page by page, with pages after the first requested concurrently"""
+        return await self._get_all_pages("/api/v1/access-records", "access records", limit, filters)
+
+    async def _get_all_pages(self, path: str, description: str, limit: Optional[int], filters: Optional[Dict]) -> Dict[str, Any]:
+        """Learn the total from the first page, then fetch the remaining pages in parallel"""
+        page_size = min(limit, PAGE_SIZE) if limit else PAGE_SIZE
+        params = dict(filters or {}, limit=page_size, offset=0)
+        first = await self._get(path, params, description)
+        if not first.get("success"):
+            return first
+
+        total = first["data"]["total"]
+        if limit:
+            total = min(total, limit)
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_PAGES)
+
+        async def fetch_page(offset):
+            async with semaphore:
+                page_limit = min(page_size, total - offset)
+                return await self._get(path, dict(filters or {}, limit=page_limit, offset=offset), description)
+
+        pages = await asyncio.gather(*[fetch_page(offset) for offset in range(page_size, total, page_size)])
+        items = list(first["data"]["items"])
+        for page in pages:
+            if not page.get("success"):
+                return page
+            items.extend(page["data"]["items"])
+
+        first["data"].update({"items": items, "count": len(items)})
+        return first
+
+    async def collect_audit_data(self, limit: Optional[int] = None):
+        """Fetch identities, access records, violations and risk summary concurrently"""
+        return await asyncio.gather(
+            self.get_identities_all(limit=limit),
+            self.get_access_records_all(limit=limit),
+            self.get_compliance_violations(),
+            self.get_risk_summary()
+        )
@@ -36,5 +36,9 @@ echo ""
 echo "Press Ctrl+C to stop the server"
 echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
 
-# Start the orchestrator API server
-python orchestrator_api.py
+# Start the orchestrator API server; gunicorn.conf.py runs one threaded worker
+if python -c "import gunicorn" 2>/dev/null; then
+    gunicorn orchestrator_api:app
+else
+    python orchestrator_api.py
+fi
@@ -1,7 +1,28 @@
+import os
 import json
-import random
 from datetime import datetime, timedelta
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+def dump_json(obj):
+    """Serialize obj to compact JSON bytes, using orjson when available"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+def write_file(path, chunks):
+    """Write byte chunks to path through a 1 MiB buffer"""
+    with open(path, "wb", buffering=1 << 20) as f:
+        for chunk in chunks:
+            f.write(chunk)
 
 def generate_sailpoint_sample_data():
     """Generate 100 sample SailPoint identity and access records"""
@@ -27,77 +48,136 @@ def generate_sailpoint_sample_data():
     
     access_types = ["Application", "Role", "Group", "Entitlement", "Permission"]
     
-    identities = []
-    access_records = []
-    
-    # Generate 100 identities
-    for i in range(100):
-        identity_id = f"ID{str(i+1).zfill(6)}"
-        employee_id = f"EMP{str(i+1001).zfill(4)}"
-        
-        identity = {
-            "id": identity_id,
-            "employeeId": employee_id,
-            "firstName": f"User{i+1}",
-            "lastName": f"LastName{i+1}",
-            "email": f"user{i+1}@company.com",
-            "department": random.choice(departments),
-            "jobTitle": random.choice(job_titles),
-            "location": random.choice(locations),
-            "manager": f"MGR{str(random.randint(1, 20)).zfill(3)}",
-            "startDate": (datetime.now() - timedelta(days=random.randint(30, 1825))).isoformat(),
-            "status": random.choice(["Active", "Active", "Active", "Active", "Inactive", "Terminated"]),
-            "riskScore": round(random.uniform(0.1, 0.9), 2),
-            "lastLogin": (datetime.now() - timedelta(days=random.randint(0, 30))).isoformat(),
+    rng = np.random.default_rng()
+    num_identities = 100
+    now = datetime.now()
+    now_iso = now.isoformat()
+    
+    def days_ago(days):
+        return [(now - timedelta(days=d)).isoformat() for d in days.tolist()]
+    
+    def choose(pool, size, weights=None):
+        p = None if weights is None else np.asarray(weights, dtype=float) / sum(weights)
+        return rng.choice(pool, size, p=p).tolist()
+    
+    def flags(probability, size):
+        return (rng.random(size) < probability).tolist()
+    
+    # Sample every identity attribute as a column, then assemble the records
+    numbers = range(1, num_identities + 1)
+    identity_ids = [f"ID{n:06d}" for n in numbers]
+    employee_ids = [f"EMP{n + 1000:04d}" for n in numbers]
+    first_names = [f"User{n}" for n in numbers]
+    last_names = [f"LastName{n}" for n in numbers]
+    emails = [f"user{n}@company.com" for n in numbers]
+    identity_departments = choose(departments, num_identities)
+    identity_titles = choose(job_titles, num_identities)
+    identity_locations = choose(locations, num_identities)
+    managers = [f"MGR{n:03d}" for n in rng.integers(1, 21, num_identities).tolist()]
+    start_dates = days_ago(rng.integers(30, 1826, num_identities))
+    statuses = choose(["Active", "Inactive", "Terminated"], num_identities, weights=[4, 1, 1])
+    risk_scores = rng.uniform(0.1, 0.9, num_identities).round(2).tolist()
+    last_logins = days_ago(rng.integers(0, 31, num_identities))
+    cost_centers = [f"CC{n}" for n in rng.integers(1000, 10000, num_identities).tolist()]
+    divisions = choose(["North America", "Europe", "Asia Pacific"], num_identities)
+    employee_types = choose(["Full-Time", "Part-Time", "Contractor"], num_identities)
+    clearance_levels = choose(["Public", "Internal", "Confidential", "Restricted"], num_identities)
+    
+    identities = [
+        {
+            "id": identity_ids[i],
+            "employeeId": employee_ids[i],
+            "firstName": first_names[i],
+            "lastName": last_names[i],
+            "email": emails[i],
+            "department": identity_departments[i],
+            "jobTitle": identity_titles[i],
+            "location": identity_locations[i],
+            "manager": managers[i],
+            "startDate": start_dates[i],
+            "status": statuses[i],
+            "riskScore": risk_scores[i],
+            "lastLogin": last_logins[i],
             "attributes": {
-                "costCenter": f"CC{random.randint(1000, 9999)}",
-                "division": random.choice(["North America", "Europe", "Asia Pacific"]),
-                "employeeType": random.choice(["Full-Time", "Part-Time", "Contractor"]),
-                "clearanceLevel": random.choice(["Public", "Internal", "Confidential", "Restricted"])
+                "costCenter": cost_centers[i],
+                "division": divisions[i],
+                "employeeType": employee_types[i],
+                "clearanceLevel": clearance_levels[i]
             }
         }
-        identities.append(identity)
-        
-        # Generate 2-5 access records per identity
-        for j in range(random.randint(2, 5)):
-            access_record = {
-                "id": str(uuid.uuid4()),
-                "identityId": identity_id,
-                "employeeId": employee_id,
-                "application": random.choice(applications),
-                "accessType": random.choice(access_types),
-                "entitlement": random.choice(entitlements),
-                "grantedDate": (datetime.now() - timedelta(days=random.randint(1, 365))).isoformat(),
-                "lastAccessed": (datetime.now() - timedelta(days=random.randint(0, 30))).isoformat(),
-                "requestedBy": f"REQ{random.randint(1, 50)}",
-                "approvedBy": f"APP{random.randint(1, 20)}",
-                "businessJustification": random.choice([
-                    "Role-based access requirement",
-                    "Project-specific access",
-                    "Temporary elevated access",
-                    "Standard department access",
-                    "Management override"
-                ]),
-                "reviewDate": (datetime.now() + timedelta(days=random.randint(30, 180))).isoformat(),
-                "certificationStatus": random.choice(["Certified", "Pending Review", "Expired", "Revoked"]),
-                "riskLevel": random.choice(["Low", "Medium", "High"]),
-                "isPrivileged": random.choice([True, False, False, False]),  # 25% privileged
-                "isOrphaned": random.choice([True, False, False, False, False]),  # 20% orphaned
-                "violatesSOD": random.choice([True, False, False, False, False]),  # 20% SOD violations
-                "compliance": {
-                    "sox": random.choice([True, True, True, False]),  # 25% SOX violations
-                    "gdpr": random.choice([True, True, True, True, False]),  # 20% GDPR violations
-                    "hipaa": random.choice([True, True, True, True, False]),  # 20% HIPAA violations
-                    "pci": random.choice([True, True, True, False])  # 25% PCI violations
-                },
-                "metadata": {
-                    "source": "SailPoint IIQ",
-                    "lastUpdated": datetime.now().isoformat(),
-                    "confidence": round(random.uniform(0.7, 1.0), 2),
-                    "dataClassification": random.choice(["Public", "Internal", "Confidential", "Restricted"])
-                }
+        for i in range(num_identities)
+    ]
+    
+    # 2-5 access records per identity, sampled column-wise across all records at once
+    counts = rng.integers(2, 6, num_identities)
+    num_records = int(counts.sum())
+    owner = np.repeat(np.arange(num_identities), counts).tolist()
+    record_applications = choose(applications, num_records)
+    record_access_types = choose(access_types, num_records)
+    record_entitlements = choose(entitlements, num_records)
+    granted_dates = days_ago(rng.integers(1, 366, num_records))
+    last_accessed = days_ago(rng.integers(0, 31, num_records))
+    requesters = [f"REQ{n}" for n in rng.integers(1, 51, num_records).tolist()]
+    approvers = [f"APP{n}" for n in rng.integers(1, 21, num_records).tolist()]
+    justifications = choose([
+        "Role-based access requirement",
+        "Project-specific access",
+        "Temporary elevated access",
+        "Standard department access",
+        "Management override"
+    ], num_records)
+    review_dates = [(now + timedelta(days=d)).isoformat() for d in rng.integers(30, 181, num_records).tolist()]
+    certification_statuses = choose(["Certified", "Pending Review", "Expired", "Revoked"], num_records)
+    risk_levels = choose(["Low", "Medium", "High"], num_records)
+    privileged = flags(0.25, num_records)
+    orphaned = flags(0.20, num_records)
+    violates_sod = flags(0.20, num_records)
+    # Compliance flags are True when compliant
+    sox = flags(0.75, num_records)
+    gdpr = flags(0.80, num_records)
+    hipaa = flags(0.80, num_records)
+    pci = flags(0.75, num_records)
+    confidences = rng.uniform(0.7, 1.0, num_records).round(2).tolist()
+    classifications = choose(["Public", "Internal", "Confidential", "Restricted"], num_records)
+    
+    # One read from the OS RNG for every record ID
+    random_bytes = os.urandom(16 * num_records)
+    record_ids = [str(uuid.UUID(bytes=random_bytes[k:k + 16], version=4)) for k in range(0, 16 * num_records, 16)]
+    
+    access_records = [
+        {
+            "id": record_ids[j],
+            "identityId": identity_ids[owner[j]],
+            "employeeId": employee_ids[owner[j]],
+            "application": record_applications[j],
+            "accessType": record_access_types[j],
+            "entitlement": record_entitlements[j],
+            "grantedDate": granted_dates[j],
+            "lastAccessed": last_accessed[j],
+            "requestedBy": requesters[j],
+            "approvedBy": approvers[j],
+            "businessJustification": justifications[j],
+            "reviewDate": review_dates[j],
+            "certificationStatus": certification_statuses[j],
+            "riskLevel": risk_levels[j],
+            "isPrivileged": privileged[j],
+            "isOrphaned": orphaned[j],
+            "violatesSOD": violates_sod[j],
+            "compliance": {
+                "sox": sox[j],
+                "gdpr": gdpr[j],
+                "hipaa": hipaa[j],
+                "pci": pci[j]
+            },
+            "metadata": {
+                "source": "SailPoint IIQ",
+                "lastUpdated": now_iso,
+                "confidence": confidences[j],
+                "dataClassification": classifications[j]
             }
-            access_records.append(access_record)
+        }
+        for j in range(num_records)
+    ]
     
     return {
         "identities": identities,
@@ -105,7 +185,7 @@ def generate_sailpoint_sample_data():
         "metadata": {
             "totalIdentities": len(identities),
             "totalAccessRecords": len(access_records),
-            "generatedAt": datetime.now().isoformat(),
+            "generatedAt": now_iso,
             "version": "1.0",
             "source": "SailPoint Identity Platform"
         }
@@ -115,17 +195,25 @@ if __name__ == "__main__":
     print("Generating SailPoint sample data...")
     data = generate_sailpoint_sample_data()
     
-    # Save complete dataset
-    with open("sailpoint_sample_data.json", "w") as f:
-        json.dump(data, f, indent=2)
+    # Serialize each collection once; the complete dataset is stitched together from the same bytes
+    identities_json = dump_json(data["identities"])
+    access_records_json = dump_json(data["accessRecords"])
     
-    # Save identities separately
-    with open("identities.json", "w") as f:
-        json.dump(data["identities"], f, indent=2)
+    files = {
+        # Complete dataset
+        "sailpoint_sample_data.json": [
+            b'{"identities":', identities_json,
+            b',"accessRecords":', access_records_json,
+            b',"metadata":', dump_json(data["metadata"]), b'}'
+        ],
+        # Identities and access records separately
+        "identities.json": [identities_json],
+        "access_records.json": [access_records_json]
+    }
     
-    # Save access records separately  
-    with open("access_records.json", "w") as f:
-        json.dump(data["accessRecords"], f, indent=2)
+    # File writes release the GIL, so the three files are written in parallel
+    with ThreadPoolExecutor(max_workers=len(files)) as executor:
+        list(executor.map(write_file, files.keys(), files.values()))
     
     print(f"Generated {data['metadata']['totalIdentities']} identities")
     print(f"Generated {data['metadata']['totalAccessRecords']} access records")
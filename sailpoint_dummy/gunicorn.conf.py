@@ -0,0 +1,20 @@
+"""
+Gunicorn configuration for the SailPoint dummy API: gunicorn sailpoint_api:app
+
+The sample data is read-only once loaded, so the app is preloaded in the master process and the
+data, indexes and columns are shared copy-on-write across the forked workers.
+"""
+
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5002')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', str(os.cpu_count() or 4)))
+worker_class = "gthread"
+threads = int(os.environ.get('SAILPOINT_THREADS', '2'))
+preload_app = True
+timeout = 120
+
+def when_ready(server):
+    # Keep the garbage collector from writing to the preloaded objects, which would copy their pages into every worker
+    gc.freeze()
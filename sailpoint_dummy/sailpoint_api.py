@@ -7,9 +7,40 @@ Simulates SailPoint IdentityIQ REST API endpoints for testing compliance orchest
 import os
 import json
 import logging
+import hashlib
+import functools
+import itertools
+import mmap
 from datetime import datetime, timedelta
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, has_request_context, request
 import random
+from collections import defaultdict
+
+import numpy as np
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import msgspec
+    HAS_MSGSPEC = True
+except ImportError:
+    HAS_MSGSPEC = False
+
+try:
+    from waitress import serve
+    HAS_WAITRESS = True
+except ImportError:
+    HAS_WAITRESS = False
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,6 +48,89 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
+def dump_json(obj):
+    """Serialize obj to compact JSON bytes, using orjson when available"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, separators=(",", ":")).encode('utf-8')
+
+def load_json(raw):
+    """Decode JSON bytes or a memoryview with the fastest available decoder"""
+    if HAS_MSGSPEC:
+        return msgspec.json.decode(raw)
+    if HAS_ORJSON:
+        return orjson.loads(raw)
+    return json.loads(raw.tobytes() if isinstance(raw, memoryview) else raw)
+
+def read_json_file(path):
+    """Decode a JSON file straight from a read-only memory map, without reading it into a bytes copy"""
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        with memoryview(mapped) as raw:
+            return load_json(raw)
+
+def jresp(obj, status=200):
+    """JSON response for obj"""
+    return Response(dump_json(obj), status=status, mimetype='application/json')
+
+@app.before_request
+def stamp_request():
+    """Read the clock once per request; handlers share the formatted timestamp"""
+    g.now_iso = datetime.now().isoformat()
+
+def request_timestamp():
+    """The current request's timestamp, or the current time outside a request"""
+    return g.now_iso if has_request_context() else datetime.now().isoformat()
+
+COMPLIANCE_TYPES = ("sox", "gdpr", "hipaa", "pci")
+# Low-cardinality string fields whose repeated values share one string object
+IDENTITY_CATEGORY_FIELDS = ("department", "jobTitle", "location", "manager", "status")
+ACCESS_CATEGORY_FIELDS = (
+    "identityId", "employeeId", "application", "accessType", "entitlement", "requestedBy",
+    "approvedBy", "businessJustification", "certificationStatus", "riskLevel"
+)
+RESPONSE_CACHE_SIZE = 512
+
+def risk_stats_numpy(risk_scores):
+    """Count identities per risk bucket and sum their scores, one vectorized pass per statistic"""
+    high = int(np.count_nonzero(risk_scores > 0.7))
+    low = int(np.count_nonzero(risk_scores <= 0.3))
+    return low, risk_scores.size - low - high, high, float(risk_scores.sum())
+
+if HAS_NUMBA:
+    @njit(cache=True)
+    def risk_stats(risk_scores):
+        """Count identities per risk bucket and sum their scores in a single compiled pass"""
+        low = medium = high = 0
+        total = 0.0
+        for i in range(risk_scores.shape[0]):
+            score = risk_scores[i]
+            total += score
+            if score > 0.7:
+                high += 1
+            elif score > 0.3:
+                medium += 1
+            else:
+                low += 1
+        return low, medium, high, total
+    
+    # Compile at import so the first report request doesn't pay for it
+    risk_stats(np.zeros(1))
+else:
+    risk_stats = risk_stats_numpy
+
+def encode_categories(values):
+    """Category-encode string values as small ints; returns (codes, vocabulary) with -1 for non-strings"""
+    vocab = {value: code for code, value in enumerate(sorted({v for v in values if isinstance(v, str)}))}
+    dtype = np.int8 if len(vocab) <= np.iinfo(np.int8).max else np.int32
+    return np.array([vocab.get(v, -1) if isinstance(v, str) else -1 for v in values], dtype=dtype), vocab
+
+def page_rows(rows, offset, limit):
+    """Rows of the requested page; without a limit every row is returned"""
+    return rows[offset:offset + int(limit)] if limit else rows
+
+# Every load gets a new version, so cached responses never outlive the data they came from
+_data_versions = itertools.count(1)
+
 class SailPointAPI:
     """
     Dummy SailPoint API that serves sample identity and access data
@@ -30,36 +144,122 @@ class SailPointAPI:
             data_file = os.path.join(script_dir, "sailpoint_sample_data.json")
         self.data_file = data_file
         self.data = self.load_data()
+        self.share_category_values()
+        self.build_indexes()
+        self.build_columns()
         
     def load_data(self):
         """Load sample SailPoint data"""
+        self.data_version = next(_data_versions)
         try:
-            with open(self.data_file, 'r') as f:
-                data = json.load(f)
+            data = read_json_file(self.data_file)
             logger.info(f"Loaded {data['metadata']['totalIdentities']} identities and {data['metadata']['totalAccessRecords']} access records")
             return data
         except Exception as e:
             logger.error(f"Error loading data: {str(e)}")
             return {"identities": [], "accessRecords": [], "metadata": {}}
     
+    def share_category_values(self):
+        """Point repeated categorical values at one shared string to cut per-record memory"""
+        for records, fields in (
+            (self.data.get("identities", []), IDENTITY_CATEGORY_FIELDS),
+            (self.data.get("accessRecords", []), ACCESS_CATEGORY_FIELDS)
+        ):
+            shared = {}
+            for record in records:
+                for field in fields:
+                    value = record.get(field)
+                    if isinstance(value, str):
+                        record[field] = shared.setdefault(value, value)
+    
+    def build_indexes(self):
+        """Index identities and access records by the fields the endpoints look up"""
+        identities = self.data.get("identities", [])
+        access_records = self.data.get("accessRecords", [])
+        
+        id_index = {}
+        employee_index = {}
+        for identity in identities:
+            id_index.setdefault(identity.get("id"), identity)
+            employee_index.setdefault(identity.get("employeeId"), identity)
+        # One lookup for either kind of ID; identity IDs win over employee IDs
+        self.any_id_index = {**employee_index, **id_index}
+        
+        self.records_by_id = {r.get("id"): r for r in access_records}
+        rows_by_identity = defaultdict(list)
+        for row, record in enumerate(access_records):
+            rows_by_identity[record.get("identityId")].append(row)
+        self.access_rows_by_identity = {key: np.array(rows, dtype=np.intp) for key, rows in rows_by_identity.items()}
+        
+        self.certs_pending = [r for r in access_records if r.get("certificationStatus") == "Pending Review"]
+        self.certs_expired = [r for r in access_records if r.get("certificationStatus") == "Expired"]
+    
+    def build_columns(self):
+        """Store the fields filtered and aggregated on as one NumPy array per attribute"""
+        identities = self.data.get("identities", [])
+        access_records = self.data.get("accessRecords", [])
+        
+        # riskScore stays float64 so the 0.3/0.7 bucket edges compare exactly as before
+        self.cols = {
+            "riskScore": np.array([i.get("riskScore", 0) for i in identities], dtype=np.float64)
+        }
+        # String fields are category-encoded, so equality filters compare small ints
+        self.vocab = {}
+        for field in ("status", "department"):
+            self.cols[field], self.vocab[field] = encode_categories([i.get(field) for i in identities])
+        
+        # One pass over the access records collects the categorical values and every flag: the
+        # two access flags, then the compliance flags (True when compliant; a missing flag counts as compliant)
+        flag_fields = ["isPrivileged", "violatesSOD"] + [f"compliance_{t}" for t in COMPLIANCE_TYPES]
+        risk_levels = []
+        applications = []
+        flag_rows = []
+        for r in access_records:
+            risk_levels.append(r.get("riskLevel"))
+            applications.append(r.get("application"))
+            compliance = r.get("compliance", {})
+            flag_rows.append((
+                bool(r.get("isPrivileged")),
+                bool(r.get("violatesSOD")),
+                *(bool(compliance.get(comp_type, True)) for comp_type in COMPLIANCE_TYPES)
+            ))
+        self.cols["riskLevel"], self.vocab["riskLevel"] = encode_categories(risk_levels)
+        self.cols["application"], self.vocab["application"] = encode_categories(applications)
+        flag_matrix = np.array(flag_rows, dtype=np.bool_).reshape(-1, len(flag_fields))
+        for j, field in enumerate(flag_fields):
+            self.cols[field] = np.ascontiguousarray(flag_matrix[:, j])
+        self.violation_mask_by_type = {comp_type: ~self.cols[f"compliance_{comp_type}"] for comp_type in COMPLIANCE_TYPES}
+        self.violation_mask_any = np.logical_or.reduce(list(self.violation_mask_by_type.values()))
+    
+    def category_mask(self, field, value):
+        """Boolean mask of the rows whose category-encoded field equals value"""
+        column = self.cols[field]
+        code = self.vocab[field].get(value)
+        if code is None:
+            return np.zeros(column.shape, dtype=np.bool_)
+        return column == code
+    
     def get_identities(self, limit=None, offset=0, filter_params=None):
         """Get identities with pagination and filtering"""
         identities = self.data.get("identities", [])
+        rows = range(len(identities))
         
         # Apply filters if provided
         if filter_params:
+            masks = []
             if "status" in filter_params:
-                identities = [i for i in identities if i.get("status") == filter_params["status"]]
+                masks.append(self.category_mask("status", filter_params["status"]))
             if "department" in filter_params:
-                identities = [i for i in identities if i.get("department") == filter_params["department"]]
+                masks.append(self.category_mask("department", filter_params["department"]))
             if "riskScore" in filter_params:
-                min_risk = float(filter_params["riskScore"])
-                identities = [i for i in identities if i.get("riskScore", 0) >= min_risk]
+                masks.append(self.cols["riskScore"] >= float(filter_params["riskScore"]))
+            if masks:
+                rows = np.flatnonzero(np.logical_and.reduce(masks))
         
         # Apply pagination
-        total = len(identities)
-        if limit:
-            identities = identities[offset:offset + int(limit)]
+        total = len(rows)
+        rows = page_rows(rows, offset, limit)
+        identities = [identities[row] for row in rows]
         
         return {
             "items": identities,
@@ -70,37 +270,40 @@ class SailPointAPI:
     
     def get_identity_by_id(self, identity_id):
         """Get specific identity by ID"""
-        identities = self.data.get("identities", [])
-        for identity in identities:
-            if identity.get("id") == identity_id or identity.get("employeeId") == identity_id:
-                return identity
-        return None
+        return self.any_id_index.get(identity_id)
     
     def get_access_records(self, limit=None, offset=0, identity_id=None, filter_params=None):
         """Get access records with filtering"""
         access_records = self.data.get("accessRecords", [])
-        
-        # Filter by identity if specified
-        if identity_id:
-            access_records = [r for r in access_records if r.get("identityId") == identity_id]
+        rows = range(len(access_records))
         
         # Apply additional filters
+        masks = []
         if filter_params:
             if "application" in filter_params:
-                access_records = [r for r in access_records if r.get("application") == filter_params["application"]]
+                masks.append(self.category_mask("application", filter_params["application"]))
             if "riskLevel" in filter_params:
-                access_records = [r for r in access_records if r.get("riskLevel") == filter_params["riskLevel"]]
+                masks.append(self.category_mask("riskLevel", filter_params["riskLevel"]))
             if "isPrivileged" in filter_params:
-                is_privileged = filter_params["isPrivileged"].lower() == "true"
-                access_records = [r for r in access_records if r.get("isPrivileged") == is_privileged]
+                is_privileged = self.cols["isPrivileged"]
+                masks.append(is_privileged if filter_params["isPrivileged"].lower() == "true" else ~is_privileged)
             if "violatesSOD" in filter_params:
-                violates_sod = filter_params["violatesSOD"].lower() == "true"
-                access_records = [r for r in access_records if r.get("violatesSOD") == violates_sod]
+                violates_sod = self.cols["violatesSOD"]
+                masks.append(violates_sod if filter_params["violatesSOD"].lower() == "true" else ~violates_sod)
+        mask = np.logical_and.reduce(masks) if masks else None
+        
+        # Filter by identity if specified; its few rows are checked against the mask directly
+        if identity_id:
+            rows = self.access_rows_by_identity.get(identity_id, np.empty(0, dtype=np.intp))
+            if mask is not None:
+                rows = rows[mask[rows]]
+        elif mask is not None:
+            rows = np.flatnonzero(mask)
         
         # Apply pagination
-        total = len(access_records)
-        if limit:
-            access_records = access_records[offset:offset + int(limit)]
+        total = len(rows)
+        rows = page_rows(rows, offset, limit)
+        access_records = [access_records[row] for row in rows]
         
         return {
             "items": access_records,
@@ -109,47 +312,41 @@ class SailPointAPI:
             "offset": offset
         }
     
-    def get_compliance_violations(self, compliance_type=None):
-        """Get compliance violations"""
+    def get_compliance_violations(self, compliance_type=None, detected_at=None):
+        """Get compliance violations, stamped with detected_at or else the request time"""
         access_records = self.data.get("accessRecords", [])
-        violations = []
+        violation_masks = self.violation_mask_by_type
+        if compliance_type:
+            if compliance_type not in violation_masks:
+                return []
+            checked_types = (compliance_type,)
+            rows = np.flatnonzero(violation_masks[compliance_type])
+        else:
+            # Check all compliance types
+            checked_types = COMPLIANCE_TYPES
+            rows = np.flatnonzero(self.violation_mask_any)
         
-        for record in access_records:
-            compliance = record.get("compliance", {})
-            
-            if compliance_type:
-                if compliance_type in compliance and not compliance[compliance_type]:
+        detected_at = detected_at or request_timestamp()
+        violations = []
+        for row in rows.tolist():
+            record = access_records[row]
+            for comp_type in checked_types:
+                if violation_masks[comp_type][row]:
                     violations.append({
                         "recordId": record["id"],
                         "identityId": record["identityId"],
                         "application": record["application"],
-                        "violationType": compliance_type.upper(),
+                        "violationType": comp_type.upper(),
                         "severity": record.get("riskLevel", "Medium"),
-                        "detectedAt": datetime.now().isoformat(),
-                        "details": record
+                        "detectedAt": detected_at
                     })
-            else:
-                # Check all compliance types
-                for comp_type, is_compliant in compliance.items():
-                    if not is_compliant:
-                        violations.append({
-                            "recordId": record["id"],
-                            "identityId": record["identityId"],
-                            "application": record["application"],
-                            "violationType": comp_type.upper(),
-                            "severity": record.get("riskLevel", "Medium"),
-                            "detectedAt": datetime.now().isoformat(),
-                            "details": record
-                        })
         
         return violations
     
     def get_certification_data(self):
         """Get access certification data"""
-        access_records = self.data.get("accessRecords", [])
-        
-        pending_certifications = [r for r in access_records if r.get("certificationStatus") == "Pending Review"]
-        expired_certifications = [r for r in access_records if r.get("certificationStatus") == "Expired"]
+        pending_certifications = self.certs_pending
+        expired_certifications = self.certs_expired
         
         return {
             "pendingCertifications": len(pending_certifications),
@@ -161,22 +358,83 @@ class SailPointAPI:
             }
         }
 
+    def get_risk_summary(self):
+        """Aggregate risk and compliance counts from the columnar arrays"""
+        cols = self.cols
+        risk_scores = cols["riskScore"]
+        low, medium, high, total = risk_stats(risk_scores)
+        
+        return {
+            "totalIdentities": int(risk_scores.size),
+            "highRiskIdentities": int(high),
+            "totalAccessRecords": int(cols["riskLevel"].size),
+            "highRiskAccess": int(np.count_nonzero(self.category_mask("riskLevel", "High"))),
+            "privilegedAccess": int(np.count_nonzero(cols["isPrivileged"])),
+            "sodViolations": int(np.count_nonzero(cols["violatesSOD"])),
+            "riskMetrics": {
+                "averageIdentityRisk": total / risk_scores.size if risk_scores.size else 0,
+                "riskDistribution": {
+                    "low": int(low),
+                    "medium": int(medium),
+                    "high": int(high)
+                }
+            },
+            "complianceStatus": {
+                comp_type: int(np.count_nonzero(~cols[f"compliance_{comp_type}"]))
+                for comp_type in COMPLIANCE_TYPES
+            }
+        }
+
 # Initialize SailPoint API
 sailpoint_api = SailPointAPI()
 
+@functools.lru_cache(maxsize=RESPONSE_CACHE_SIZE)
+def encode_payload(compute, data_version, key):
+    """Encode a route's response envelope minus the timestamp, with its ETag"""
+    body = dump_json(compute(*key))
+    return body[:-1], hashlib.blake2b(body, digest_size=16).hexdigest()
+
+# Stands in for the request timestamp inside cached bodies that carry it per item
+TIMESTAMP_PLACEHOLDER = "__REQUEST_TIMESTAMP__"
+TIMESTAMP_PLACEHOLDER_BYTES = f'"{TIMESTAMP_PLACEHOLDER}"'.encode('utf-8')
+
+def with_timestamp(prefix):
+    """Close a cached envelope with the request's timestamp"""
+    return prefix + f',"timestamp":"{g.now_iso}"}}'.encode('utf-8')
+
+def cached_response(compute, *key, restamp=False):
+    """Serve compute(*key) from the response cache, answering 304 when the client's copy is current;
+    with restamp, TIMESTAMP_PLACEHOLDER values in the body become the request timestamp"""
+    prefix, etag = encode_payload(compute, sailpoint_api.data_version, key)
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        body = with_timestamp(prefix)
+        if restamp:
+            body = body.replace(TIMESTAMP_PLACEHOLDER_BYTES, f'"{g.now_iso}"'.encode('utf-8'))
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag, weak=True)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
 @app.route('/api/v1/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
+    # Health checks should always reach the server, so this skips the ETag handling
+    prefix, _ = encode_payload(health_payload, sailpoint_api.data_version, ())
+    return Response(with_timestamp(prefix), mimetype='application/json')
+
+def health_payload():
+    """Response envelope for the health check"""
+    return {
         "status": "healthy",
         "service": "SailPoint Dummy API",
         "version": "1.0.0",
-        "timestamp": datetime.now().isoformat(),
         "dataStatus": {
             "identitiesLoaded": len(sailpoint_api.data.get("identities", [])),
             "accessRecordsLoaded": len(sailpoint_api.data.get("accessRecords", []))
         }
-    })
+    }
 
 @app.route('/api/v1/identities', methods=['GET'])
 def get_identities():
@@ -193,18 +451,20 @@ def get_identities():
     if request.args.get('riskScore'):
         filter_params['riskScore'] = request.args.get('riskScore')
     
-    result = sailpoint_api.get_identities(limit, offset, filter_params)
-    
-    return jsonify({
+    return cached_response(identities_payload, limit, offset, tuple(sorted(filter_params.items())))
+
+def identities_payload(limit, offset, filters):
+    """Response envelope for an identities query"""
+    filter_params = dict(filters)
+    return {
         "success": True,
-        "data": result,
+        "data": sailpoint_api.get_identities(limit, offset, filter_params),
         "query": {
             "limit": limit,
             "offset": offset,
             "filters": filter_params
-        },
-        "timestamp": datetime.now().isoformat()
-    })
+        }
+    }
 
 @app.route('/api/v1/identities/<identity_id>', methods=['GET'])
 def get_identity(identity_id):
@@ -212,17 +472,17 @@ def get_identity(identity_id):
     identity = sailpoint_api.get_identity_by_id(identity_id)
     
     if identity:
-        return jsonify({
+        return jresp({
             "success": True,
             "data": identity,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": g.now_iso
         })
     else:
-        return jsonify({
+        return jresp({
             "success": False,
             "error": "Identity not found",
             "identityId": identity_id
-        }), 404
+        }, 404)
 
 @app.route('/api/v1/access-records', methods=['GET'])
 def get_access_records():
@@ -242,113 +502,94 @@ def get_access_records():
     if request.args.get('violatesSOD'):
         filter_params['violatesSOD'] = request.args.get('violatesSOD')
     
-    result = sailpoint_api.get_access_records(limit, offset, identity_id, filter_params)
-    
-    return jsonify({
+    return cached_response(access_records_payload, limit, offset, identity_id, tuple(sorted(filter_params.items())))
+
+def access_records_payload(limit, offset, identity_id, filters):
+    """Response envelope for an access records query"""
+    filter_params = dict(filters)
+    return {
         "success": True,
-        "data": result,
+        "data": sailpoint_api.get_access_records(limit, offset, identity_id, filter_params),
         "query": {
             "limit": limit,
             "offset": offset,
             "identityId": identity_id,
             "filters": filter_params
-        },
-        "timestamp": datetime.now().isoformat()
-    })
+        }
+    }
 
 @app.route('/api/v1/compliance/violations', methods=['GET'])
 def get_compliance_violations():
     """Get compliance violations"""
     compliance_type = request.args.get('type')  # sox, gdpr, hipaa, pci
     
-    violations = sailpoint_api.get_compliance_violations(compliance_type)
-    
-    return jsonify({
+    return cached_response(violations_payload, compliance_type, restamp=True)
+
+def violations_payload(compliance_type):
+    """Response envelope for a compliance violations query"""
+    # detectedAt is filled in per response, so the cached body holds a placeholder
+    violations = sailpoint_api.get_compliance_violations(compliance_type, detected_at=TIMESTAMP_PLACEHOLDER)
+    # Each violated record is sent once, however many violations reference it
+    records_by_id = sailpoint_api.records_by_id
+    return {
         "success": True,
         "data": {
             "violations": violations,
             "count": len(violations),
-            "complianceType": compliance_type or "all"
-        },
-        "timestamp": datetime.now().isoformat()
-    })
+            "complianceType": compliance_type or "all",
+            "recordsById": {v["recordId"]: records_by_id[v["recordId"]] for v in violations}
+        }
+    }
 
 @app.route('/api/v1/certifications', methods=['GET'])
 def get_certifications():
     """Get certification data"""
-    cert_data = sailpoint_api.get_certification_data()
-    
-    return jsonify({
+    return cached_response(certifications_payload)
+
+def certifications_payload():
+    """Response envelope for the certification data"""
+    return {
         "success": True,
-        "data": cert_data,
-        "timestamp": datetime.now().isoformat()
-    })
+        "data": sailpoint_api.get_certification_data()
+    }
 
 @app.route('/api/v1/reports/risk-summary', methods=['GET'])
 def get_risk_summary():
     """Get risk summary report"""
-    identities = sailpoint_api.data.get("identities", [])
-    access_records = sailpoint_api.data.get("accessRecords", [])
-    
-    # Calculate risk statistics
-    high_risk_identities = [i for i in identities if i.get("riskScore", 0) > 0.7]
-    high_risk_access = [r for r in access_records if r.get("riskLevel") == "High"]
-    privileged_access = [r for r in access_records if r.get("isPrivileged")]
-    sod_violations = [r for r in access_records if r.get("violatesSOD")]
-    
-    summary = {
-        "totalIdentities": len(identities),
-        "highRiskIdentities": len(high_risk_identities),
-        "totalAccessRecords": len(access_records),
-        "highRiskAccess": len(high_risk_access),
-        "privilegedAccess": len(privileged_access),
-        "sodViolations": len(sod_violations),
-        "riskMetrics": {
-            "averageIdentityRisk": sum(i.get("riskScore", 0) for i in identities) / len(identities) if identities else 0,
-            "riskDistribution": {
-                "low": len([i for i in identities if i.get("riskScore", 0) <= 0.3]),
-                "medium": len([i for i in identities if 0.3 < i.get("riskScore", 0) <= 0.7]),
-                "high": len([i for i in identities if i.get("riskScore", 0) > 0.7])
-            }
-        },
-        "complianceStatus": {
-            "sox": len([r for r in access_records if not r.get("compliance", {}).get("sox", True)]),
-            "gdpr": len([r for r in access_records if not r.get("compliance", {}).get("gdpr", True)]),
-            "hipaa": len([r for r in access_records if not r.get("compliance", {}).get("hipaa", True)]),
-            "pci": len([r for r in access_records if not r.get("compliance", {}).get("pci", True)])
-        }
-    }
-    
-    return jsonify({
+    return cached_response(risk_summary_payload)
+
+def risk_summary_payload():
+    """Response envelope for the risk summary report"""
+    return {
         "success": True,
-        "data": summary,
-        "timestamp": datetime.now().isoformat()
-    })
+        "data": sailpoint_api.get_risk_summary()
+    }
 
 @app.route('/api/v1/identities/<identity_id>/access', methods=['GET'])
 def get_identity_access(identity_id):
     """Get all access records for a specific identity"""
     identity = sailpoint_api.get_identity_by_id(identity_id)
     if not identity:
-        return jsonify({
+        return jresp({
             "success": False,
             "error": "Identity not found"
-        }), 404
+        }, 404)
     
-    access_records = sailpoint_api.get_access_records(identity_id=identity_id)
-    
-    return jsonify({
+    return cached_response(identity_access_payload, identity_id)
+
+def identity_access_payload(identity_id):
+    """Response envelope for an identity and its access records"""
+    return {
         "success": True,
         "data": {
-            "identity": identity,
-            "accessRecords": access_records
-        },
-        "timestamp": datetime.now().isoformat()
-    })
+            "identity": sailpoint_api.get_identity_by_id(identity_id),
+            "accessRecords": sailpoint_api.get_access_records(identity_id=identity_id)
+        }
+    }
 
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({
+    return jresp({
         "success": False,
         "error": "Endpoint not found",
         "availableEndpoints": [
@@ -361,14 +602,14 @@ def not_found(error):
             "/api/v1/reports/risk-summary",
             "/api/v1/identities/{id}/access"
         ]
-    }), 404
+    }, 404)
 
 @app.errorhandler(500)
 def internal_error(error):
-    return jsonify({
+    return jresp({
         "success": False,
         "error": "Internal server error"
-    }), 500
+    }, 500)
 
 if __name__ == '__main__':
     print("Starting SailPoint Dummy API Server...")
@@ -387,4 +628,10 @@ if __name__ == '__main__':
     print("")
     print("Press Ctrl+C to stop the server")
     
-    app.run(debug=True, host='0.0.0.0', port=5002)
+    # waitress is a multi-threaded production server; the Werkzeug dev server is the fallback.
+    # No reloader: it would start a second process and load the data twice
+    if HAS_WAITRESS:
+        serve(app, host='0.0.0.0', port=5002, threads=int(os.getenv("SAILPOINT_THREADS", "8")))
+    else:
+        debug = os.getenv("FLASK_DEBUG", "").lower() in ("1", "true")
+        app.run(debug=debug, use_reloader=False, host='0.0.0.0', port=5002, threaded=True)
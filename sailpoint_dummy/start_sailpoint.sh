@@ -30,5 +30,9 @@ echo ""
 echo "Press Ctrl+C to stop the server"
 echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
 
-# Start the SailPoint API server
-python sailpoint_api.py
+# Start the SailPoint API server; under gunicorn the data is loaded once and shared by all workers
+if python -c "import gunicorn" 2>/dev/null; then
+    gunicorn sailpoint_api:app
+else
+    python sailpoint_api.py
+fi
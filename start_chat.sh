@@ -38,5 +38,9 @@ echo ""
 echo "Press Ctrl+C to stop the server"
 echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
 
-# Start the Flask application
-python app.py
+# Start the Flask application; under gunicorn the model is preloaded once and shared by all workers
+if python -c "import gunicorn" 2>/dev/null; then
+    gunicorn app:app
+else
+    python app.py
+fi